@@ -0,0 +1,580 @@
+"""
+Замеры производительности отрисовщиков и растровых алгоритмов лабораторных.
+
+Каждый случай - фиксированная сцена заданного размера: правильные
+многогранники из get_polyhedron, сферы с растущим числом сегментов,
+сгенерированные поверхности, заливки и отрезки на холсте, изображения
+для перевода цветов. Для каждого случая записываются мс на кадр
+(медиана повторов), пропускная способность в собственных единицах случая
+(закрашенные пиксели, отрезки, рёбра, точки...) и пиковая память
+(tracemalloc).
+
+Модули лабораторных загружаются по пути к файлу, поэтому одинаковые имена
+(windows/, lab6.py в lab6 и lab7) не конфликтуют. Окна не создаются:
+вместо tk.Canvas используется NullCanvas, который только считает вызовы,
+так что замеряется сам алгоритм без вывода в Tk.
+
+Результаты сохраняются в benchmarks/results/<commit>.json;
+--compare старый.json печатает отношение времён к прошлому прогону.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --filter lab8
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+SOLIDS = ["tetrahedron", "cube", "octahedron", "icosahedron", "dodecahedron"]
+
+
+def load_module(relative_path):
+    """Загружает файл лабораторной как модуль с уникальным именем."""
+    path = os.path.join(ROOT, relative_path)
+    name = relative_path.replace(os.sep, "_").replace("/", "_")[: -len(".py")]
+    if name in sys.modules:
+        return sys.modules[name]
+
+    # Соседние импорты (lab7 -> lab6) ищутся в папке самого файла,
+    # импорты вида windows.strips — в папке над пакетом
+    folders = [os.path.dirname(path)]
+    if os.path.exists(os.path.join(folders[0], "__init__.py")):
+        folders.append(os.path.dirname(folders[0]))
+    sys.path[:0] = folders
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    finally:
+        for folder in folders:
+            sys.path.remove(folder)
+    return module
+
+
+class NullCanvas:
+    """Заменитель tk.Canvas: принимает те же вызовы и только считает элементы."""
+
+    def __init__(self, width=400, height=400):
+        self.width = width
+        self.height = height
+        self.items = 0
+
+    def _create(self, *args, **kwargs):
+        self.items += 1
+        return self.items
+
+    create_line = create_polygon = create_oval = create_rectangle = _create
+    create_image = _create
+
+    def delete(self, *args):
+        pass
+
+    def bind(self, *args):
+        pass
+
+    def unbind(self, *args):
+        pass
+
+    def update(self):
+        pass
+
+    def after_idle(self, callback):
+        return None
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+
+def count_canvas_items(canvas, draw):
+    """Сколько элементов Tk создаёт один вызов draw на NullCanvas."""
+    before = canvas.items
+    draw()
+    return canvas.items - before
+
+
+def make_window(cls, **attributes):
+    """Экземпляр окна без вызова __init__ (он создаёт виджеты Tk)."""
+    window = object.__new__(cls)
+    for name, value in attributes.items():
+        setattr(window, name, value)
+    return window
+
+
+def get_test_image(size):
+    """Детерминированное цветное изображение size x size."""
+    y, x = np.mgrid[0:size, 0:size]
+    image = np.stack(
+        [x * 255 // max(size - 1, 1), y * 255 // max(size - 1, 1), (x ^ y) & 255],
+        axis=-1,
+    )
+    return image.astype(np.uint8)
+
+
+def get_surface_faces(n):
+    """Грани-квадраты регулярной сетки (n + 1) x (n + 1) вершин."""
+    index = np.arange((n + 1) ** 2).reshape(n + 1, n + 1)
+    return np.stack(
+        [index[:-1, :-1], index[1:, :-1], index[1:, 1:], index[:-1, 1:]], axis=-1
+    ).reshape(-1, 4)
+
+
+def get_surface_vertices(n):
+    """Вершины поверхности z = sin(sqrt(x^2 + y^2)) на [-3, 3] x [-3, 3]."""
+    x, y = np.meshgrid(np.linspace(-3, 3, n + 1), np.linspace(-3, 3, n + 1), indexing="ij")
+    z = np.sin(np.sqrt(x**2 + y**2))
+    return np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+
+# Случаи: функция получает размер и возвращает (кадр, объём работы кадра,
+# единица): закрашенные пиксели, элементы холста, отрезки, точки и т. п.
+
+
+def bench_lab6_wireframe(scene, size):
+    lab6 = load_module("lab6/lab6.py")
+    if scene == "solid":
+        polyhedron = lab6.get_polyhedron(size)
+    elif scene == "sphere":
+        sphere = lab6.Sphere(radius=3.0, segments=size, rings=size)
+        polyhedron = lab6.Polyhedron3D(np.array(sphere.vertices), sphere.edges)
+    else:
+        lab7 = load_module("lab7/lab7.py")
+        window = make_window(lab7.NewMainWindow)
+        polyhedron = window.generate_surface_mesh(
+            -3, 3, -3, 3, size, size, window.surface_sin
+        )
+
+    camera = lab6.Camera([5, 5, 6], [0, 0, 0], [0, 0, 1])
+    canvas = NullCanvas()
+    drawer = lab6.PolyhedronDrawer(
+        canvas,
+        polyhedron,
+        lab6.get_progection_matrix("perspective"),
+        camera.get_view_matrix(),
+    )
+    return drawer.draw, count_canvas_items(canvas, drawer.draw), "lines"
+
+
+def bench_lab8_zbuffer(scene, size, workers=1):
+    lab8 = load_module("lab8/lab8.py")
+    if scene == "solid":
+        polyhedron = lab8.get_polyhedron(size)
+    elif scene == "sphere":
+        sphere = lab8.Sphere(radius=3.0, segments=size, rings=size)
+        polyhedron = lab8.Polyhedron3D(sphere.vertices, sphere.edges, sphere.faces)
+    else:
+        faces = get_surface_faces(size)
+        mesh = lab8.Mesh(
+            get_surface_vertices(size), faces.ravel(), np.arange(0, faces.size + 1, 4)
+        )
+        polyhedron = lab8.Polyhedron3D.from_mesh(mesh)
+    polyhedron.color = "#FF5733"
+
+    camera = lab8.Camera([5, 5, 6], [0, 0, 0], [0, 0, 1])
+    drawer = lab8.PolyhedronDrawer(
+        None,
+        lab8.get_progection_matrix("perspective"),
+        camera.get_view_matrix(),
+        camera,
+        objects=[polyhedron],
+        workers=workers,
+    )
+
+    def frame():
+        # Сбрасываем кэш преобразованных граней: кадр считается целиком
+        drawer.invalidate_view()
+        drawer.render()
+
+    frame.close = drawer.close
+    # Пиксели, в которые попала хотя бы одна грань
+    frame()
+    return frame, int(np.isfinite(drawer.z_buffer).sum()), "px"
+
+
+def bench_lab9_gouraud(size):
+    lab9 = load_module("lab9/GuroLightning.py")
+    vertices, faces = lab9.create_sphere(2, size, size)
+    normals = lab9.compute_normals(vertices, faces)
+    canvas = NullCanvas(800, 800)
+
+    def frame():
+        lab9.render(canvas, vertices, faces, normals, canvas.width, canvas.height)
+
+    return frame, count_canvas_items(canvas, frame), "polygons"
+
+
+def bench_lab9_phong(size):
+    lab9 = load_module("lab9/PhongShading.py")
+    window = make_window(
+        lab9.PhongSphereApp,
+        canvas=NullCanvas(800, 800),
+        light_dir=lab9.normalize(np.array([1, 1, 1])),
+        view_dir=lab9.normalize(np.array([0, 0, 1])),
+        ambient=np.array([0.1, 0.1, 0.1]),
+        diffuse=np.array([0.8, 0.8, 0.8]),
+        specular=np.array([1.0, 1.0, 1.0]),
+        shininess=32,
+        angle_x=0.3,
+        angle_y=0.2,
+    )
+    window.vertices, window.normals = lab9.generate_sphere(1, size, size)
+    window.faces = lab9.generate_sphere_faces(size, size)
+    polygons = count_canvas_items(window.canvas, window.draw_sphere)
+    return window.draw_sphere, polygons, "polygons"
+
+
+def bench_lab3_fill(size):
+    """Заливка круга радиуса size/2 - 10, граница нарисована кистью."""
+    lab3 = load_module("lab3/windows/task1_window.py")
+    canvas = NullCanvas(size, size)
+    window = make_window(
+        lab3.Task1aWindow,
+        canvas=canvas,
+        root=canvas,
+        width=size,
+        height=size,
+        border_mask=np.zeros((size, size), dtype=np.uint8),
+    )
+    center, radius = size // 2, size // 2 - 10
+    for angle in np.linspace(0, 2 * np.pi, 8 * size, endpoint=False):
+        x = int(center + radius * np.cos(angle))
+        y = int(center + radius * np.sin(angle))
+        window.paint(SimpleNamespace(x=x, y=y))
+
+    def frame():
+        return lab3.span_fill(window.border_mask, center, center)
+
+    return frame, int(frame().sum()), "px"
+
+
+def bench_lab3_lines(algorithm, size):
+    """size случайных отрезков на холсте 800 x 600 одним пакетом."""
+    lab3 = load_module("lab3/windows/task2_window.py")
+    rng = np.random.default_rng(0)
+    lines = rng.integers(0, [800, 600, 800, 600], (size, 4))
+    line = getattr(lab3, f"{algorithm}_lines")
+    pixels = len(line(lines)[0])
+
+    def frame():
+        line(lines)
+
+    return frame, pixels, "px"
+
+
+def bench_lab3_triangles(size):
+    """size случайных градиентных треугольников со стороной до 100 px на 800 x 600."""
+    lab3 = load_module("lab3/windows/task3_window.py")
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, [700, 500], (size, 1, 2))
+    triangles = corners + rng.uniform(0, 100, (size, 3, 2))
+    colors = rng.random((size, 3, 3))
+    image = np.ones((600, 800, 3))
+
+    def frame():
+        lab3.fill_gradient_triangles(image, triangles, colors)
+
+    return frame, size, "triangles"
+
+
+def get_test_polygon(size):
+    """Волнистое кольцо из size вершин; дрожание углов даёт самопересечения."""
+    rng = np.random.default_rng(0)
+    angles = np.linspace(0, 2 * np.pi, size, endpoint=False)
+    angles += rng.normal(0, 2 * np.pi / size, size)
+    radius = 200 + 40 * np.sin(7 * angles) + rng.normal(0, 1, size)
+    return list(zip(400 + radius * np.cos(angles), 300 + radius * np.sin(angles)))
+
+
+def bench_lab4_intersections(method, size):
+    """Самопересечения полигона из size рёбер: сетка или прежний перебор пар."""
+    lab4 = load_module("lab4/lab4.py")
+    polygon = lab4.Polygon(get_test_polygon(size))
+    if method == "grid":
+        return lambda: lab4.find_polygon_intersections([polygon]), size, "edges"
+
+    window = make_window(lab4.PolygonEditor)
+    points = polygon.points
+
+    def frame():
+        # Цикл из check_polygon_intersections до сетки, с его границами j
+        n = len(points)
+        found = []
+        for i in range(n):
+            for j in range(i + 2, n - 1):
+                point = window.get_intersection_point(
+                    points[i], points[(i + 1) % n], points[j], points[(j + 1) % n]
+                )
+                if point:
+                    found.append(point)
+        return found
+
+    return frame, size, "edges"
+
+
+def bench_lab4_transforms(size):
+    """200 поворотов полигона из size вершин и один пересчёт координат."""
+    lab4 = load_module("lab4/lab4.py")
+    polygon = lab4.Polygon(get_test_polygon(size))
+    cos, sin = np.cos(np.radians(1.8)), np.sin(np.radians(1.8))
+    rotation = np.array([[cos, -sin, 0], [sin, cos, 0], [0, 0, 1]])
+    matrix = lab4.get_pivot_transform(rotation, (400, 300))
+
+    def frame():
+        for _ in range(200):
+            polygon.push_transform(matrix)
+        polygon.get_bbox()
+        # Сброс стека без применения: следующий кадр начинает с тех же вершин
+        polygon.set_points(polygon.vertices)
+
+    return frame, size, "vertices"
+
+
+def bench_lab4_classify(size):
+    """size случайных точек против сцены из 8 полигонов по 100 вершин."""
+    lab4 = load_module("lab4/lab4.py")
+    rng = np.random.default_rng(0)
+    polygons = []
+    for index in range(8):
+        ring = np.array(get_test_polygon(100)) / 4
+        ring += [100 * (index % 4), 200 * (index // 4)]
+        polygons.append(lab4.Polygon([tuple(point) for point in ring.tolist()]))
+    points = rng.uniform(0, [800, 600], (size, 2))
+    return lambda: lab4.classify_points(points, polygons), size, "points"
+
+
+def bench_lab5_lsystem(size):
+    """Фрактальное растение на size итераций: потоковая развёртка и черепаха."""
+    lab5 = load_module("lab5/task1a.py")
+    lab5.default_iterations = size
+    points = lab5.points_l_system(3)
+    # Точки после первой — концы отрезков (шагов F и возвратов ']')
+    return lambda: lab5.points_l_system(3), len(points) - 1, "segments"
+
+
+def bench_lab2_hsv(size):
+    """Прямой и обратный перевод RGB <-> HSV со сдвигом, как в process_image."""
+    lab2 = load_module("lab2/windows/task3_window.py")
+    image = get_test_image(size)
+    hsv = np.empty(image.shape, dtype=np.float32)
+    rgb = np.empty_like(image)
+
+    def frame():
+        lab2.rgb_to_hsv_array(image, out=hsv)
+        lab2.shift_hsv(hsv, 30, 0.1, -0.1)
+        lab2.hsv_to_rgb_array(hsv, out=rgb)
+
+    return frame, size * size, "px"
+
+
+def bench_lab2_gray(size):
+    lab2 = load_module("lab2/windows/task1_window.py")
+    window = make_window(lab2.Task1Window)
+    image = get_test_image(size)
+
+    def frame():
+        window.rgb2gray_average(image)
+        window.rgb2gray_weighted(image)
+
+    return frame, size * size, "px"
+
+
+def get_cases(quick):
+    """Список (имя, параметр размера, фабрика кадра)."""
+    spheres = [16] if quick else [16, 32, 64]
+    surfaces = [20] if quick else [20, 50, 100]
+    images = [256] if quick else [256, 1024, 4096]
+    cases = []
+    for solid in SOLIDS:
+        cases.append(("lab6.wireframe.solid", solid, lambda s: bench_lab6_wireframe("solid", s)))
+        cases.append(("lab8.zbuffer.solid", solid, lambda s: bench_lab8_zbuffer("solid", s)))
+    for size in spheres:
+        cases.append(("lab6.wireframe.sphere", size, lambda s: bench_lab6_wireframe("sphere", s)))
+        cases.append(("lab8.zbuffer.sphere", size, lambda s: bench_lab8_zbuffer("sphere", s)))
+        cases.append(("lab9.gouraud.sphere", size, bench_lab9_gouraud))
+        cases.append(("lab9.phong.sphere", size, bench_lab9_phong))
+    for size in surfaces:
+        cases.append(("lab6.wireframe.surface", size, lambda s: bench_lab6_wireframe("surface", s)))
+        cases.append(("lab8.zbuffer.surface", size, lambda s: bench_lab8_zbuffer("surface", s)))
+    if (os.cpu_count() or 1) > 1:
+        workers = os.cpu_count()
+        for size in surfaces:
+            cases.append(
+                (
+                    f"lab8.zbuffer.surface.tiles{workers}",
+                    size,
+                    lambda s: bench_lab8_zbuffer("surface", s, workers=workers),
+                )
+            )
+    for size in [200] if quick else [200, 1000]:
+        cases.append(("lab3.fill.circle", size, bench_lab3_fill))
+    for size in [100] if quick else [100, 1000]:
+        cases.append(("lab3.lines.bresenham", size, lambda s: bench_lab3_lines("bresenham", s)))
+        cases.append(("lab3.lines.wu", size, lambda s: bench_lab3_lines("wu", s)))
+    for size in [100] if quick else [100, 1000]:
+        cases.append(("lab3.triangles", size, bench_lab3_triangles))
+    for size in [1000] if quick else [1000, 10000, 100000]:
+        cases.append(("lab4.intersections.grid", size, lambda s: bench_lab4_intersections("grid", s)))
+    # Перебор квадратичен: 10000 рёбер — около полутора минут на кадр
+    for size in [1000] if quick else [1000, 3000]:
+        cases.append(("lab4.intersections.brute", size, lambda s: bench_lab4_intersections("brute", s)))
+    for size in [10000] if quick else [10000, 100000]:
+        cases.append(("lab4.transforms", size, bench_lab4_transforms))
+    for size in [100000] if quick else [100000, 1000000]:
+        cases.append(("lab4.classify", size, bench_lab4_classify))
+    for size in [7] if quick else [7, 9]:
+        cases.append(("lab5.lsystem.plant", size, bench_lab5_lsystem))
+    for size in images:
+        cases.append(("lab2.hsv", size, bench_lab2_hsv))
+        cases.append(("lab2.gray", size, bench_lab2_gray))
+    return cases
+
+
+def measure(frame, repeats, min_time):
+    """Медианное время кадра в секундах и пиковая память одного кадра в байтах."""
+    frame()  # Прогрев: кэши, импорт, первое выделение буферов
+
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeats or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        frame()
+        times.append(time.perf_counter() - start)
+        if len(times) >= 100 * repeats:
+            break
+
+    tracemalloc.start()
+    frame()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return float(np.median(times)), len(times), peak
+
+
+def get_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, dirty
+
+
+def print_comparison(results, previous_path):
+    with open(previous_path) as file:
+        previous = {
+            (row["case"], str(row["size"])): row for row in json.load(file)["results"]
+        }
+    print(f"\nСравнение с {previous_path} (время: новое / старое)")
+    for row in results:
+        old = previous.get((row["case"], str(row["size"])))
+        if old is None:
+            continue
+        ratio = row["ms_per_frame"] / old["ms_per_frame"]
+        print(f"{row['case']:<36} {str(row['size']):<14} x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры отрисовщиков лабораторных")
+    parser.add_argument("--quick", action="store_true", help="только малые сцены")
+    parser.add_argument("--filter", default="", help="подстрока имени случая")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.5, help="секунд на случай")
+    parser.add_argument("--output", help="файл JSON, по умолчанию results/<commit>.json")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args(argv)
+
+    results = []
+    for case, size, factory in get_cases(args.quick):
+        if args.filter not in case:
+            continue
+        # Отладочные print лабораторных не должны попадать в отчёт
+        skipped = None
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            try:
+                frame, count, unit = factory(size)
+            except ImportError as error:
+                skipped = error
+            else:
+                try:
+                    seconds, runs, peak = measure(frame, args.repeats, args.min_time)
+                finally:
+                    if hasattr(frame, "close"):
+                        frame.close()
+        if skipped is not None:
+            print(f"{case:<36} {str(size):<14} пропущен: {skipped}")
+            continue
+        row = {
+            "case": case,
+            "size": size,
+            "ms_per_frame": seconds * 1000,
+            "unit": unit,
+            "items_per_frame": count,
+            "items_per_second": count / seconds if seconds > 0 else None,
+            "peak_memory_kb": peak / 1024,
+            "runs": runs,
+        }
+        results.append(row)
+        print(
+            f"{case:<36} {str(size):<14} {row['ms_per_frame']:10.2f} ms"
+            f" {count / seconds / 1e6:10.2f} M{unit + '/s':<12}"
+            f" {row['peak_memory_kb']:10.0f} KB"
+        )
+
+    commit, dirty = get_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    print(f"\nРезультаты: {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
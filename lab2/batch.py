@@ -0,0 +1,174 @@
+"""
+Пакетная обработка папки изображений задачами lab2 без GUI:
+
+    python batch.py photos --tasks gray channels hsv --hue 30 --workers 4
+
+Результаты раскладываются как у окон задач, но в отдельную папку на
+каждый файл (имя с расширением, чтобы a.png и a.jpg не смешивались):
+output/task1/<файл>/, output/task2/<файл>/ и
+output/task3/<сдвиги>/<файл>/<имя>_processed.<ext>, с сохранением вложенных
+папок. Изображения, чьи результаты новее исходника, пропускаются; для
+task3 результаты с другими сдвигами HSV лежат в другой папке.
+"""
+
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from windows.strips import TILED_PIXELS, open_large_image
+from windows.task1_window import get_gray_paths, write_gray_images
+from windows.task2_window import get_channel_paths, write_channel_images
+from windows.task3_window import get_processed_path, write_hsv_image
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ppm", ".tif", ".tiff")
+TASKS = ("gray", "channels", "hsv")
+
+
+def find_images(input_dir, output=None):
+    """
+    Относительные пути всех изображений в папке и её подпапках. Папка
+    результатов, если она внутри input_dir, пропускается.
+    """
+    skipped = os.path.realpath(output) if output else None
+    images = []
+    for folder, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(
+            name
+            for name in dirs
+            if os.path.realpath(os.path.join(folder, name)) != skipped
+        )
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(folder, name)
+                images.append(os.path.relpath(path, input_dir))
+    return images
+
+
+def get_shift_folder(shifts):
+    """Имя папки task3 по сдвигам: h30_s10_v-5 (S и V в процентах)."""
+    h_shift, s_shift, v_shift = shifts
+    return f"h{h_shift:g}_s{s_shift * 100:g}_v{v_shift * 100:g}"
+
+
+def get_task_outputs(task, path, relative, output, large, shifts):
+    """(папка результата, список файлов) задачи для одного изображения."""
+    # Папка названа полным именем файла: a.png и a.jpg не пересекаются
+    folder = relative
+    if task == "gray":
+        folder = os.path.join(output, "task1", folder)
+        return folder, get_gray_paths(folder, large)
+    if task == "channels":
+        folder = os.path.join(output, "task2", folder)
+        return folder, get_channel_paths(folder, large)
+    folder = os.path.join(output, "task3", get_shift_folder(shifts), folder)
+    return folder, [get_processed_path(path, folder, large)]
+
+
+def is_up_to_date(path, outputs):
+    """Все результаты существуют и записаны не раньше исходника."""
+    source_time = os.stat(path).st_mtime_ns
+    for output_path in outputs:
+        if not os.path.exists(output_path):
+            return False
+        if os.stat(output_path).st_mtime_ns < source_time:
+            return False
+    return True
+
+
+def process_image(input_dir, relative, output, tasks, shifts, force=False):
+    """
+    Выполняется в процессе пула. Возвращает (relative, пикселей,
+    выполненные задачи, секунд, ошибка): при успехе ошибка None, иначе
+    строка с описанием, а остальные поля пусты.
+    """
+    path = os.path.join(input_dir, relative)
+    started = time.perf_counter()
+    try:
+        with open_large_image(path) as image:
+            width, height = image.size
+        large = width * height >= TILED_PIXELS
+        done = []
+        for task in tasks:
+            folder, outputs = get_task_outputs(
+                task, path, relative, output, large, shifts
+            )
+            if not force and is_up_to_date(path, outputs):
+                continue
+            os.makedirs(folder, exist_ok=True)
+            if task == "gray":
+                write_gray_images(path, folder)
+            elif task == "channels":
+                write_channel_images(path, folder)
+            else:
+                write_hsv_image(path, outputs[0], *shifts)
+            done.append(task)
+    except Exception as e:
+        # Любая ошибка одного файла (в том числе DecompressionBombError)
+        # не должна останавливать весь пул
+        return relative, 0, [], 0.0, f"{type(e).__name__}: {e}"
+    return relative, width * height, done, time.perf_counter() - started, None
+
+
+def run_batch(input_dir, output, tasks, shifts, workers=None, force=False):
+    """Раздаёт изображения пулу процессов и печатает скорость по каждому."""
+    images = find_images(input_dir, output)
+    processed = skipped = failed = 0
+    total_pixels = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                process_image, input_dir, relative, output, tasks, shifts, force
+            )
+            for relative in images
+        ]
+        for future in as_completed(futures):
+            relative, pixels, done, seconds, error = future.result()
+            if error is not None:
+                failed += 1
+                print(f"{relative}: ошибка: {error}")
+                continue
+            if not done:
+                skipped += 1
+                continue
+            processed += 1
+            total_pixels += pixels
+            print(
+                f"{relative}: {', '.join(done)}, {pixels / 1e6:.1f} Мп "
+                f"за {seconds:.2f} с ({pixels / 1e6 / max(seconds, 1e-9):.1f} Мп/с)"
+            )
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Обработано {processed}, пропущено {skipped}, ошибок {failed} "
+        f"за {elapsed:.1f} с ({processed / max(elapsed, 1e-9):.1f} изобр./с, "
+        f"{total_pixels / 1e6 / max(elapsed, 1e-9):.1f} Мп/с)"
+    )
+    return processed, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Пакетная обработка изображений задачами lab2"
+    )
+    parser.add_argument("input", help="папка с изображениями")
+    parser.add_argument("--output", default="output", help="папка результатов")
+    parser.add_argument("--tasks", nargs="+", choices=TASKS, default=list(TASKS))
+    parser.add_argument("--hue", type=float, default=0, help="сдвиг H в градусах")
+    parser.add_argument("--saturation", type=float, default=0, help="сдвиг S, %%")
+    parser.add_argument("--value", type=float, default=0, help="сдвиг V, %%")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов")
+    parser.add_argument(
+        "--force", action="store_true", help="пересчитать актуальные результаты"
+    )
+    args = parser.parse_args(argv)
+
+    shifts = (args.hue, args.saturation / 100.0, args.value / 100.0)
+    run_batch(args.input, args.output, args.tasks, shifts, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from PIL import Image, ImageTk
 from windows.task1_window import Task1Window
 from windows.task2_window import Task2Window
 from windows.task3_window import Task3Window
+from windows.strips import is_large_image, read_preview
 
 
 class Lab2:
@@ -80,7 +81,11 @@ class Lab2:
     def load_image(self):
         path = self.path_entry.get()
         try:
-            image = Image.open(path)
+            if is_large_image(path):
+                # Большой файл не декодируется целиком ради превью
+                image = read_preview(path, 1200, self.window_max)
+            else:
+                image = Image.open(path)
             width, height = image.size
             if width > 1200 or height > self.window_max:
                 new_height = self.window_max
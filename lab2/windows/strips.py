@@ -0,0 +1,193 @@
+"""
+Полосовое чтение и запись больших изображений.
+
+По-настоящему потоково (через memmap, одна полоса в памяти) читаются
+только несжатые файлы: PPM/PGM, BMP и TIFF без сжатия. PNG и JPEG PIL
+умеет декодировать лишь целиком, поэтому для них полосы режутся из
+изображения, полностью лежащего в памяти.
+"""
+
+import numpy as np
+from PIL import Image
+
+
+STRIP_PIXELS = 1 << 22  # Пикселей в одной полосе строк (~12 МБ для RGB)
+TILED_PIXELS = 1 << 25  # Начиная с ~33 Мп задачи работают полосами
+MAX_PIXELS = 1 << 34  # Предел размера для open_large_image (~17 Гп вместо ~179 Мп)
+
+# Несжатые раскладки строк PIL: байт на пиксель и порядок каналов R, G, B
+RAW_LAYOUTS = {
+    "RGB": (3, (0, 1, 2)),
+    "BGR": (3, (2, 1, 0)),
+    "RGBX": (4, (0, 1, 2)),
+    "RGBA": (4, (0, 1, 2)),
+    "BGRX": (4, (2, 1, 0)),
+    "BGRA": (4, (2, 1, 0)),
+    "L": (1, (0, 0, 0)),
+}
+
+
+def open_large_image(path):
+    """
+    Image.open для файлов, которые могут оказаться большими. Защита PIL от
+    "бомб распаковки" срабатывает уже на ~179 Мп, то есть ровно на
+    спутниковых снимках, ради которых нужен полосовой режим. Предел
+    поднимается (но не снимается) только на время открытия, остальные
+    вызовы Image.open в процессе по-прежнему защищены.
+    """
+    limit = Image.MAX_IMAGE_PIXELS
+    if limit is not None and limit < MAX_PIXELS:
+        Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+    try:
+        return Image.open(path)
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+
+
+def is_large_image(path):
+    """Размер читается из заголовка, сами пиксели не декодируются."""
+    with open_large_image(path) as image:
+        width, height = image.size
+    return width * height >= TILED_PIXELS
+
+
+def get_raw_rows(image, path):
+    """
+    Если пиксели лежат в файле без сжатия (PPM/PGM, BMP, TIFF без сжатия),
+    отображает их в память через np.memmap и возвращает
+    (строки (height, width, bpp), каналы, перевёрнуто ли). Иначе None.
+    """
+    if len(image.tile) != 1:
+        return None
+    codec, extents, offset, args = image.tile[0][:4]
+    width, height = image.size
+    if codec != "raw" or tuple(extents) != (0, 0, width, height):
+        return None
+    if isinstance(args, str):
+        args = (args,)
+    rawmode = args[0]
+    stride = args[1] if len(args) > 1 else 0
+    orientation = args[2] if len(args) > 2 else 1
+    if rawmode not in RAW_LAYOUTS:
+        return None
+
+    bpp, channels = RAW_LAYOUTS[rawmode]
+    stride = stride or width * bpp
+    data = np.memmap(
+        path, dtype=np.uint8, mode="r", offset=offset, shape=(height, stride)
+    )
+    rows = data[:, : width * bpp].reshape(height, width, bpp)
+    return rows, channels, orientation < 0
+
+
+class StripReader:
+    """
+    Читает изображение полосами RGB uint8 (rows, width, 3).
+
+    Несжатые файлы (PPM/PGM, BMP, TIFF без сжатия) читаются через memmap,
+    и в памяти одновременно находится только одна полоса. Сжатые форматы
+    (PNG, JPEG) PIL умеет декодировать только целиком: для них всё
+    изображение RGB оказывается в памяти, а полосы нарезаются из него.
+    """
+
+    def __init__(self, path, strip_rows=None):
+        self.image = open_large_image(path)
+        self.width, self.height = self.image.size
+        self.strip_rows = strip_rows or max(1, STRIP_PIXELS // max(self.width, 1))
+        self.raw = get_raw_rows(self.image, path)
+        self.decoded = None
+        self.buffer = np.empty(
+            (min(self.strip_rows, self.height), self.width, 3), dtype=np.uint8
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.raw = None
+        self.decoded = None
+        self.image.close()
+
+    def __iter__(self):
+        """Отдаёт (top, полоса); полоса переиспользуется между итерациями."""
+        for top in range(0, self.height, self.strip_rows):
+            yield top, self.read(top, min(top + self.strip_rows, self.height))
+
+    def read(self, top, bottom):
+        strip = self.buffer[: bottom - top]
+        if self.raw is not None:
+            rows, channels, flipped = self.raw
+            if flipped:
+                # BMP хранит строки снизу вверх
+                part = rows[self.height - bottom : self.height - top][::-1]
+            else:
+                part = rows[top:bottom]
+            for channel, source in enumerate(channels):
+                strip[:, :, channel] = part[:, :, source]
+            return strip
+
+        if self.decoded is None:
+            self.decoded = np.asarray(self.image.convert("RGB"))
+        strip[:] = self.decoded[top:bottom]
+        return strip
+
+
+class StripWriter:
+    """
+    Пишет изображение полосами в PGM (channels=1) или PPM (channels=3).
+    Заголовок известен заранее, поэтому строки сразу уходят в файл.
+    """
+
+    def __init__(self, path, width, height, channels=3):
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.written = 0
+        self.file = open(path, "wb")
+        magic = b"P5" if channels == 1 else b"P6"
+        self.file.write(b"%s\n%d %d\n255\n" % (magic, width, height))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+    def write(self, strip):
+        strip = np.ascontiguousarray(strip, dtype=np.uint8)
+        row_size = self.width * self.channels
+        if strip.shape[1] != self.width or strip.size != len(strip) * row_size:
+            raise ValueError(f"Некорректная полоса {strip.shape}")
+        self.file.write(strip.data)
+        self.written += len(strip)
+
+    def close(self):
+        self.file.close()
+        if self.written != self.height:
+            raise ValueError(f"Записано {self.written} строк из {self.height}")
+
+
+def read_preview(path, max_width, max_height):
+    """
+    Уменьшенная копия без декодирования всего файла: у несжатых файлов
+    берётся каждая step-я строка и столбец, JPEG PIL декодирует сразу
+    в уменьшенном масштабе (draft).
+    """
+    with open_large_image(path) as image:
+        width, height = image.size
+        raw = get_raw_rows(image, path)
+        if raw is None:
+            image.thumbnail((max_width, max_height))
+            return image.convert("RGB")
+
+    rows, channels, flipped = raw
+    step = max(1, -(-width // max_width), -(-height // max_height))
+    sample = rows[::-1][::step, ::step] if flipped else rows[::step, ::step]
+    preview = np.ascontiguousarray(sample[:, :, list(channels)])
+    return Image.fromarray(preview)
@@ -1,10 +1,130 @@
 import os
 import tkinter as tk
 import numpy as np
+from contextlib import ExitStack
 
 import matplotlib.pyplot as plt
 from PIL import Image
 
+from windows.strips import StripReader, StripWriter, is_large_image
+
+
+GRAY_CHUNK = 1 << 20  # Пикселей за один проход: ограничивает временные массивы
+
+
+def make_gray_luts(weights):
+    """
+    Таблицы (3, 256) uint16: вклад значения канала в яркость в формате
+    с фиксированной точкой, round(w * v * 256). Сумма трёх вкладов не
+    превышает 255 * 256, поэтому помещается в uint16.
+    """
+    values = np.arange(256)
+    return np.round(np.outer(weights, values) * 256).astype(np.uint16)
+
+
+GRAY_LUT_AVERAGE = make_gray_luts((0.3, 0.59, 0.11))
+GRAY_LUT_WEIGHTED = make_gray_luts((0.21, 0.72, 0.07))
+
+
+def rgb_to_gray_lut(img, luts, out=None, histogram=None):
+    """
+    Полутоновое изображение uint8 по таблицам luts без вещественных копий:
+    на каждый кусок строк три выборки из таблиц, сумма в uint16 и сдвиг
+    на 8 бит. Если передан histogram (256,), в него добавляется
+    гистограмма результата.
+    """
+    height, width = img.shape[:2]
+    if out is None:
+        out = np.empty((height, width), dtype=np.uint8)
+    rows = max(1, GRAY_CHUNK // max(width, 1))
+    accumulator = np.empty((min(rows, height), width), dtype=np.uint16)
+    term = np.empty_like(accumulator)
+
+    for start in range(0, height, rows):
+        chunk = img[start : start + rows]
+        total = accumulator[: len(chunk)]
+        part = term[: len(chunk)]
+        np.take(luts[0], chunk[:, :, 0], out=total)
+        for channel in (1, 2):
+            np.take(luts[channel], chunk[:, :, channel], out=part)
+            total += part
+        total >>= 8
+        out[start : start + rows] = total
+        if histogram is not None:
+            histogram += np.bincount(
+                out[start : start + rows].ravel(), minlength=256
+            )
+    return out
+
+
+GRAY_NAMES = ("average", "weighted", "difference")
+
+
+def get_gray_paths(output_folder, large=False):
+    """Пути трёх полутоновых изображений; большие пишутся полосами в PGM."""
+    ext = ".pgm" if large else ".jpg"
+    return [
+        os.path.join(output_folder, f"grayscale_{name}{ext}") for name in GRAY_NAMES
+    ]
+
+
+def write_gray_images(path, output_folder):
+    """
+    Сохраняет полутоновые изображения (average, weighted, difference)
+    и возвращает (histogram_average, histogram_weighted).
+    """
+    if is_large_image(path):
+        return write_gray_strips(path, output_folder)
+
+    image = Image.open(path).convert("RGB")
+    image_array = np.array(image)
+
+    histogram_average = np.zeros(256, dtype=np.int64)
+    histogram_weighted = np.zeros(256, dtype=np.int64)
+    gray_image_average = rgb_to_gray_lut(
+        image_array, GRAY_LUT_AVERAGE, histogram=histogram_average
+    )
+    gray_image_weighted = rgb_to_gray_lut(
+        image_array, GRAY_LUT_WEIGHTED, histogram=histogram_weighted
+    )
+    difference_image = np.abs(gray_image_average - gray_image_weighted)
+
+    average_path, weighted_path, difference_path = get_gray_paths(output_folder)
+    Image.fromarray(gray_image_average).save(average_path)
+    Image.fromarray(gray_image_weighted).save(weighted_path)
+    Image.fromarray(difference_image).save(difference_path)
+    return histogram_average, histogram_weighted
+
+
+def write_gray_strips(path, output_folder, strip_rows=None):
+    """
+    Полосовой режим для больших изображений: каждая полоса переводится
+    в оттенки серого и сразу дописывается в PGM, гистограммы копятся по
+    полосам. Возвращает (histogram_average, histogram_weighted).
+    """
+    histogram_average = np.zeros(256, dtype=np.int64)
+    histogram_weighted = np.zeros(256, dtype=np.int64)
+
+    with StripReader(path, strip_rows) as reader, ExitStack() as files:
+        size = (reader.width, reader.height, 1)
+        average_file, weighted_file, difference_file = [
+            files.enter_context(StripWriter(file_path, *size))
+            for file_path in get_gray_paths(output_folder, large=True)
+        ]
+        average = np.empty(reader.buffer.shape[:2], dtype=np.uint8)
+        weighted = np.empty_like(average)
+        for top, strip in reader:
+            gray_average = rgb_to_gray_lut(
+                strip, GRAY_LUT_AVERAGE, average[: len(strip)], histogram_average
+            )
+            gray_weighted = rgb_to_gray_lut(
+                strip, GRAY_LUT_WEIGHTED, weighted[: len(strip)], histogram_weighted
+            )
+            average_file.write(gray_average)
+            weighted_file.write(gray_weighted)
+            difference_file.write(np.abs(gray_average - gray_weighted))
+    return histogram_average, histogram_weighted
+
 
 class Task1Window:
     def __init__(self, root: tk.Tk, parent):
@@ -29,46 +149,26 @@ class Task1Window:
         )
 
     def start(self):
-        image = Image.open(self.parent.path_entry.get())
-        image_array = np.array(image)
-
+        path = self.parent.path_entry.get()
         output_folder = os.path.join(self.parent.output_path, "task1")
         os.makedirs(output_folder, exist_ok=True)
 
-        gray_image_average = self.rgb2gray_average(image_array)
-        gray_image_weighted = self.rgb2gray_weighted(image_array)
-
-        Image.fromarray(gray_image_average).save(
-            os.path.join(output_folder, "grayscale_average.jpg")
-        )
-        Image.fromarray(gray_image_weighted).save(
-            os.path.join(output_folder, "grayscale_weighted.jpg")
-        )
-
-        difference_image = np.abs(gray_image_average - gray_image_weighted)
-        Image.fromarray(difference_image).save(
-            os.path.join(output_folder, "grayscale_difference.jpg")
-        )
-
-        self.plot_histograms(gray_image_average, gray_image_weighted)
+        self.plot_histograms(*write_gray_images(path, output_folder))
 
     def rgb2gray_average(self, img):
-        return (0.3 * img[:, :, 0] + 0.59 * img[:, :, 1] + 0.11 * img[:, :, 2]).astype(
-            np.uint8
-        )
+        return rgb_to_gray_lut(img, GRAY_LUT_AVERAGE)
 
     def rgb2gray_weighted(self, img):
-        return (0.21 * img[:, :, 0] + 0.72 * img[:, :, 1] + 0.07 * img[:, :, 2]).astype(
-            np.uint8
-        )
+        return rgb_to_gray_lut(img, GRAY_LUT_WEIGHTED)
 
-    def plot_histograms(self, gray_image_average, gray_image_weighted):
+    def plot_histograms(self, histogram_average, histogram_weighted):
+        """Гистограммы уже посчитаны (256 значений), строим их столбцами."""
         fig, axs = plt.subplots(1, 2, figsize=(12, 5))
 
-        axs[0].hist(gray_image_average.ravel(), bins=256, color="gray", alpha=0.75)
+        axs[0].bar(range(256), histogram_average, width=1, color="gray", alpha=0.75)
         axs[0].set_title("Grayscale Image Histogram (Average Method)")
 
-        axs[1].hist(gray_image_weighted.ravel(), bins=256, color="gray", alpha=0.75)
+        axs[1].bar(range(256), histogram_weighted, width=1, color="gray", alpha=0.75)
         axs[1].set_title("Grayscale Image Histogram (Weighted Method)")
 
         plt.show()
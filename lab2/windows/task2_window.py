@@ -1,10 +1,72 @@
 import os
 import tkinter as tk
 import numpy as np
+from contextlib import ExitStack
 
 import matplotlib.pyplot as plt
 from PIL import Image
 
+from windows.strips import StripReader, StripWriter, is_large_image
+
+
+CHANNEL_NAMES = ("R", "G", "B")
+
+
+def add_channel_histograms(image_array, histograms):
+    """Добавляет к histograms (3, 256) гистограммы каналов R, G, B."""
+    for channel in range(3):
+        histograms[channel] += np.bincount(
+            image_array[:, :, channel].ravel(), minlength=256
+        )
+    return histograms
+
+
+def get_channel_paths(output_dir, large=False):
+    """Пути изображений каналов; большие пишутся полосами в PPM."""
+    ext = ".ppm" if large else ".jpg"
+    return [os.path.join(output_dir, f"{name}_channel{ext}") for name in CHANNEL_NAMES]
+
+
+def write_channel_images(path, output_dir):
+    """Сохраняет изображения каналов R, G, B и возвращает гистограммы (3, 256)."""
+    if is_large_image(path):
+        return write_channel_strips(path, output_dir)
+
+    image = Image.open(path).convert("RGB")
+    image_array = np.array(image)
+
+    for channel, channel_path in enumerate(get_channel_paths(output_dir)):
+        channel_image = np.zeros_like(image_array)
+        channel_image[:, :, channel] = image_array[:, :, channel]
+        Image.fromarray(channel_image).save(channel_path)
+
+    histograms = np.zeros((3, 256), dtype=np.int64)
+    return add_channel_histograms(image_array, histograms)
+
+
+def write_channel_strips(path, output_dir, strip_rows=None):
+    """
+    Полосовой режим для больших изображений: каналы каждой полосы сразу
+    дописываются в свои PPM, гистограммы копятся по полосам.
+    """
+    histograms = np.zeros((3, 256), dtype=np.int64)
+
+    with StripReader(path, strip_rows) as reader, ExitStack() as files:
+        size = (reader.width, reader.height, 3)
+        writers = [
+            files.enter_context(StripWriter(channel_path, *size))
+            for channel_path in get_channel_paths(output_dir, large=True)
+        ]
+        channel_image = np.zeros_like(reader.buffer)
+        for top, strip in reader:
+            add_channel_histograms(strip, histograms)
+            part = channel_image[: len(strip)]
+            for channel, writer in enumerate(writers):
+                part[:, :, channel] = strip[:, :, channel]
+                writer.write(part)
+                part[:, :, channel] = 0
+    return histograms
+
 
 class Task2Window:
     def __init__(self, root: tk.Tk, parent):
@@ -29,44 +91,22 @@ class Task2Window:
         )
 
     def start(self):
-        image = Image.open(self.parent.path_entry.get())
-        image_array = np.array(image)
-
-        R, G, B = image_array[:, :, 0], image_array[:, :, 1], image_array[:, :, 2]
-
-        R_image = np.zeros_like(image_array)
-        G_image = np.zeros_like(image_array)
-        B_image = np.zeros_like(image_array)
-
-        R_image[:, :, 0] = R
-        G_image[:, :, 1] = G
-        B_image[:, :, 2] = B
-
+        path = self.parent.path_entry.get()
         output_dir = os.path.join(self.parent.output_path, "task2")
         os.makedirs(output_dir, exist_ok=True)
 
-        Image.fromarray(R_image).save(os.path.join(output_dir, "R_channel.jpg"))
-        Image.fromarray(G_image).save(os.path.join(output_dir, "G_channel.jpg"))
-        Image.fromarray(B_image).save(os.path.join(output_dir, "B_channel.jpg"))
+        self.plot_histograms(write_channel_images(path, output_dir))
 
+    def plot_histograms(self, histograms):
         fig, axs = plt.subplots(1, 3, figsize=(18, 5))
 
-        r_hist = [0] * 256
-        for value in R.ravel():
-            r_hist[value] += 1
-        axs[0].bar(range(256), r_hist, color="red", alpha=0.6)
+        axs[0].bar(range(256), histograms[0], color="red", alpha=0.6)
         axs[0].set_title("hexagram for R-сhanel")
 
-        g_hist = [0] * 256
-        for value in G.ravel():
-            g_hist[value] += 1
-        axs[1].bar(range(256), g_hist, color="green", alpha=0.6)
+        axs[1].bar(range(256), histograms[1], color="green", alpha=0.6)
         axs[1].set_title("hexagram for G-сhanel")
 
-        b_hist = [0] * 256
-        for value in B.ravel():
-            b_hist[value] += 1
-        axs[2].bar(range(256), b_hist, color="blue", alpha=0.6)
+        axs[2].bar(range(256), histograms[2], color="blue", alpha=0.6)
         axs[2].set_title("hexagram for B-сhanel")
 
         plt.show()
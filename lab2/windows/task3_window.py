@@ -1,9 +1,156 @@
 import os
 import tkinter as tk
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog
 from PIL import Image, ImageTk
 
+from windows.strips import StripReader, StripWriter, is_large_image, read_preview
+
+
+HSV_CHUNK = 1 << 16  # Пикселей за один проход: ограничивает временные массивы
+
+def rgb_to_hsv_array(rgb, out=None):
+    """
+    Переводит массив RGB uint8 (..., 3) в HSV float32 (..., 3):
+    H в градусах [0, 360), S и V в [0, 1]. Ветвления по максимальному
+    каналу заменены масками; изображение обрабатывается кусками по
+    HSV_CHUNK пикселей, результат пишется в out.
+    """
+    rgb = np.asarray(rgb)
+    if out is None:
+        out = np.empty(rgb.shape, dtype=np.float32)
+    source = rgb.reshape(-1, 3)
+    target = out.reshape(-1, 3)
+
+    for start in range(0, len(source), HSV_CHUNK):
+        pixels = source[start : start + HSV_CHUNK].astype(np.float32)
+        pixels *= np.float32(1 / 255)
+        r, g, b = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+        mx = np.maximum(np.maximum(r, g), b)
+        c = mx - np.minimum(np.minimum(r, g), b)
+
+        # Сектор по максимальному каналу: R, затем G, затем B
+        red_max = mx == r
+        green_max = ~red_max & (mx == g)
+        h = np.where(red_max, g - b, np.where(green_max, b - r, r - g))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h /= c
+            s = c / mx
+        h += np.where(red_max, 0, np.where(green_max, 2, 4)).astype(np.float32)
+        h *= 60
+        h[h < 0] += 360
+        h[c == 0] = 0
+        s[mx == 0] = 0
+
+        chunk = target[start : start + HSV_CHUNK]
+        chunk[:, 0] = h
+        chunk[:, 1] = s
+        chunk[:, 2] = mx
+    return out
+
+
+def hsv_to_rgb_array(hsv, out=None):
+    """
+    Обратный перевод HSV float32 (..., 3) в RGB uint8 (..., 3).
+
+    Вместо выбора сектора оттенка каждый канал считается одной формулой
+    без ветвлений: f(n) = V - C * clip(min(k, 4 - k), 0, 1), где
+    k = (n + H / 60) mod 6 и n = 5, 3, 1 для R, G, B. Она совпадает
+    с посекторными формулами, включая H = 360.
+    """
+    hsv = np.asarray(hsv, dtype=np.float32)
+    if out is None:
+        out = np.empty(hsv.shape, dtype=np.uint8)
+    source = hsv.reshape(-1, 3)
+    target = out.reshape(-1, 3)
+
+    for start in range(0, len(source), HSV_CHUNK):
+        pixels = source[start : start + HSV_CHUNK]
+        sector_position = pixels[:, 0] / np.float32(60)
+        c = pixels[:, 2] * pixels[:, 1]
+        chunk = target[start : start + HSV_CHUNK]
+        k = np.empty_like(c)
+        ramp = np.empty_like(c)
+        for channel, n in enumerate((5, 3, 1)):
+            np.add(sector_position, n, out=k)
+            np.mod(k, 6, out=k)
+            np.subtract(4, k, out=ramp)
+            np.minimum(k, ramp, out=ramp)
+            np.clip(ramp, 0, 1, out=ramp)
+            ramp *= c
+            np.subtract(pixels[:, 2], ramp, out=ramp)
+            ramp *= 255
+            np.clip(ramp, 0, 255, out=ramp)
+            # Округление к ближайшему: приведение к uint8 само отбросит дробь
+            ramp += np.float32(0.5)
+            chunk[:, channel] = ramp
+    return out
+
+
+def shift_hsv(hsv, h_shift, s_shift, v_shift):
+    """Сдвигает H, S, V на месте и обрезает их до допустимых диапазонов."""
+    for channel, shift, upper in ((0, h_shift, 360), (1, s_shift, 1), (2, v_shift, 1)):
+        plane = hsv[..., channel]
+        plane += shift
+        np.clip(plane, 0, upper, out=plane)
+    return hsv
+
+
+def apply_hsv_shift(hsv, h_shift, s_shift, v_shift, out=None):
+    """
+    Сдвигает HSV и переводит результат в RGB uint8, не меняя сам hsv:
+    копируется только текущий кусок из HSV_CHUNK пикселей.
+    """
+    if out is None:
+        out = np.empty(hsv.shape, dtype=np.uint8)
+    source = hsv.reshape(-1, 3)
+    target = out.reshape(-1, 3)
+    block = np.empty((min(HSV_CHUNK, len(source)), 3), dtype=np.float32)
+    for start in range(0, len(source), HSV_CHUNK):
+        part = block[: len(source[start : start + HSV_CHUNK])]
+        np.copyto(part, source[start : start + HSV_CHUNK])
+        shift_hsv(part, h_shift, s_shift, v_shift)
+        hsv_to_rgb_array(part, out=target[start : start + HSV_CHUNK])
+    return out
+
+
+def get_processed_path(path, output_folder, large=False):
+    """Путь результата: <имя>_processed с расширением исходника или .ppm."""
+    filename, ext = os.path.splitext(os.path.basename(path))
+    if large:
+        ext = ".ppm"
+    return os.path.join(output_folder, f"{filename}_processed{ext}")
+
+
+def write_hsv_image(path, save_path, h_shift, s_shift, v_shift):
+    """Сдвигает HSV изображения из файла и сохраняет результат."""
+    if is_large_image(path):
+        return write_hsv_strips(path, save_path, h_shift, s_shift, v_shift)
+    rgb = np.array(Image.open(path).convert("RGB"))
+    hsv = rgb_to_hsv_array(rgb)
+    Image.fromarray(apply_hsv_shift(hsv, h_shift, s_shift, v_shift, out=rgb)).save(
+        save_path
+    )
+    return save_path
+
+
+def write_hsv_strips(path, save_path, h_shift, s_shift, v_shift, strip_rows=None):
+    """
+    Полосовой режим для больших изображений: полоса читается из файла,
+    сдвигается в HSV и сразу дописывается в PPM.
+    """
+    with StripReader(path, strip_rows) as reader, StripWriter(
+        save_path, reader.width, reader.height
+    ) as writer:
+        hsv = np.empty(reader.buffer.shape, dtype=np.float32)
+        rgb = np.empty_like(reader.buffer)
+        for top, strip in reader:
+            part = rgb_to_hsv_array(strip, out=hsv[: len(strip)])
+            shift_hsv(part, h_shift, s_shift, v_shift)
+            writer.write(hsv_to_rgb_array(part, out=rgb[: len(strip)]))
+    return save_path
+
 
 class Task3Window:
     def __init__(self, root: tk.Toplevel, parent):
@@ -12,15 +159,37 @@ class Task3Window:
         self.output_path = self.parent.create_and_get_folder_path(
             os.path.join(self.parent.output_path, "task3")
         )
-        self.image = Image.open(self.parent.path_entry.get())
         self.root.configure(bg=parent.back_ground)
 
-        self.width, self.height = self.image.size
+        self.path = self.parent.path_entry.get()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.saving = None
+        self.pending_check = None
+        self.tiled = is_large_image(self.path)
+        preview_size = (2 * parent.window_max, parent.window_max)
+
+        if self.tiled:
+            # Большое изображение целиком не читается: экспорт идёт полосами
+            self.full_hsv = None
+            proxy = read_preview(self.path, *preview_size)
+        else:
+            # Файл декодируется один раз; HSV полного размера считается в фоне
+            self.image = Image.open(self.path).convert("RGB")
+            self.img_array = np.array(self.image)
+            self.full_hsv = self.executor.submit(rgb_to_hsv_array, self.img_array)
+            proxy = self.image.copy()
+            proxy.thumbnail(preview_size)
+
+        # Уменьшенная копия под размер окна для живого предпросмотра
+        self.proxy_hsv = rgb_to_hsv_array(np.array(proxy))
+        self.proxy_rgb = np.empty(self.proxy_hsv.shape, dtype=np.uint8)
+        self.pending_preview = None
+
+        self.width, self.height = proxy.size
         self.root.geometry(f"{self.width + 100}x{self.height}")
         self.root.title("task3 ")
 
-        self.img_array = np.array(self.image)
-        self.img_display = ImageTk.PhotoImage(self.image)
+        self.img_display = ImageTk.PhotoImage(proxy, master=self.root)
         self.img_label = tk.Label(self.root, image=self.img_display)
         self.img_label.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
@@ -28,106 +197,97 @@ class Task3Window:
         controls_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10, pady=10)
 
         self.hue_slider = tk.Scale(
-            controls_frame, from_=-360, to=360, orient=tk.HORIZONTAL, label="Hue"
+            controls_frame,
+            from_=-360,
+            to=360,
+            orient=tk.HORIZONTAL,
+            label="Hue",
+            command=self.schedule_preview,
         )
         self.hue_slider.pack(pady=5)
         self.saturation_slider = tk.Scale(
-            controls_frame, from_=-100, to=100, orient=tk.HORIZONTAL, label="Saturation"
+            controls_frame,
+            from_=-100,
+            to=100,
+            orient=tk.HORIZONTAL,
+            label="Saturation",
+            command=self.schedule_preview,
         )
         self.saturation_slider.pack(pady=5)
         self.value_slider = tk.Scale(
-            controls_frame, from_=-100, to=100, orient=tk.HORIZONTAL, label="Value"
+            controls_frame,
+            from_=-100,
+            to=100,
+            orient=tk.HORIZONTAL,
+            label="Value",
+            command=self.schedule_preview,
         )
         self.value_slider.pack(pady=5)
 
-        self.process_button = tk.Button(
-            controls_frame, text="Process", command=self.process_image
-        )
-        self.process_button.pack(pady=5)
         self.save_button = tk.Button(
             controls_frame, text="Save", command=self.save_image
         )
         self.save_button.pack(pady=5)
 
-    def process_image(self):
-        self.process_button.configure(state=tk.DISABLED)
+        self.root.bind("<Destroy>", self.on_destroy)
+
+    def on_destroy(self, event):
+        """<Destroy> приходит и от дочерних виджетов: реагируем только на окно."""
+        if event.widget is not self.root:
+            return
+        for pending in (self.pending_preview, self.pending_check):
+            if pending is not None:
+                self.root.after_cancel(pending)
+        self.pending_preview = self.pending_check = None
+        # Начатый экспорт доработает в своём потоке, новых задач не будет
+        self.executor.shutdown(wait=False)
+
+    def get_shifts(self):
         h_shift = self.hue_slider.get()
         s_shift = self.saturation_slider.get() / 100.0
         v_shift = self.value_slider.get() / 100.0
+        return h_shift, s_shift, v_shift
 
-        self.image = Image.open(self.parent.path_entry.get())
-        self.img_array = np.array(self.image.convert("RGB"))
+    def schedule_preview(self, value=None):
+        """Несколько движений ползунка подряд дают одну перерисовку."""
+        if self.pending_preview is None:
+            self.pending_preview = self.root.after_idle(self.update_preview)
 
-        hsv_img = np.array(
-            [self.rgb_to_hsv(pixel) for pixel in self.img_array.reshape(-1, 3)]
-        )
-        hsv_img[:, 0] = np.clip(hsv_img[:, 0] + h_shift, 0, 360)
-        hsv_img[:, 1] = np.clip(hsv_img[:, 1] + s_shift, 0, 1)
-        hsv_img[:, 2] = np.clip(hsv_img[:, 2] + v_shift, 0, 1)
-
-        rgb_img = np.array(
-            [self.hsv_to_rgb(pixel) for pixel in hsv_img], dtype=np.uint8
-        )
-        self.image = Image.fromarray(rgb_img.reshape((self.height, self.width, 3)))
-
-        self.img_display = ImageTk.PhotoImage(self.image)
-        self.img_label.config(image=self.img_display)
-        self.process_button.configure(state=tk.NORMAL)
+    def update_preview(self):
+        self.pending_preview = None
+        apply_hsv_shift(self.proxy_hsv, *self.get_shifts(), out=self.proxy_rgb)
+        self.img_display.paste(Image.fromarray(self.proxy_rgb))
 
     def save_image(self):
-        original_filename = os.path.basename(self.parent.path_entry.get())
-        filename, ext = os.path.splitext(original_filename)
-        save_filename = f"{filename}_processed{ext}"
-
-        save_path = os.path.join(self.output_path, save_filename)
+        if self.saving is not None:
+            return
+        save_path = get_processed_path(self.path, self.output_path, self.tiled)
 
-        self.image.convert("RGB").save(save_path)
-        print(f"Image saved to {save_path}")
-
-    def rgb_to_hsv(self, rgb):
-        r, g, b = rgb / 255.0
-        mx = max(r, g, b)
-        mn = min(r, g, b)
-        h = s = v = (mx + mn) / 2.0
-        c = mx - mn
+        # Полное разрешение обрабатывается в рабочем потоке
+        self.save_button.configure(state=tk.DISABLED, text="Saving...")
+        self.saving = self.executor.submit(
+            self.export_image, save_path, *self.get_shifts()
+        )
+        self.pending_check = self.root.after(100, self.check_saving)
 
-        if c == 0:
-            h = 0
-        else:
-            if mx == r:
-                h = (g - b) / c
-            elif mx == g:
-                h = (b - r) / c + 2
-            else:
-                h = (r - g) / c + 4
-            h *= 60
-            if h < 0:
-                h += 360
-
-        s = 0 if mx == 0 else (mx - mn) / mx
-        v = mx
-        return np.array([h, s, v])
-
-    def hsv_to_rgb(self, hsv):
-        h, s, v = hsv
-        c = v * s
-        x = c * (1 - abs((h / 60) % 2 - 1))
-        m = v - c
-
-        if h < 60:
-            r, g, b = c, x, 0
-        elif h < 120:
-            r, g, b = x, c, 0
-        elif h < 180:
-            r, g, b = 0, c, x
-        elif h < 240:
-            r, g, b = 0, x, c
-        elif h < 300:
-            r, g, b = x, 0, c
-        else:
-            r, g, b = c, 0, x
+    def export_image(self, save_path, h_shift, s_shift, v_shift):
+        """Выполняется в рабочем потоке, поэтому не обращается к Tk."""
+        if self.tiled:
+            return write_hsv_strips(self.path, save_path, h_shift, s_shift, v_shift)
+        rgb = apply_hsv_shift(self.full_hsv.result(), h_shift, s_shift, v_shift)
+        Image.fromarray(rgb).save(save_path)
+        return save_path
 
-        r = (r + m) * 255
-        g = (g + m) * 255
-        b = (b + m) * 255
-        return np.array([r, g, b], dtype=np.uint8)
+    def check_saving(self):
+        self.pending_check = None
+        if not self.saving.done():
+            self.pending_check = self.root.after(100, self.check_saving)
+            return
+        try:
+            print(f"Image saved to {self.saving.result()}")
+        except Exception as e:
+            # Любая ошибка экспорта только сообщается: кнопка должна ожить
+            print("Error saving image:", e)
+        finally:
+            self.saving = None
+            self.save_button.configure(state=tk.NORMAL, text="Save")
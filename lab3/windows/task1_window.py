@@ -1,7 +1,66 @@
 import tkinter as tk
 from tkinter import filedialog
 from PIL import Image, ImageTk
-import math
+import numpy as np
+
+
+def span_fill(blocked, x, y):
+    """
+    Заливка 4-связной области от затравки (x, y) по маске blocked (h, w):
+    ненулевые пиксели — граница. Возвращает bool-маску залитых пикселей.
+
+    В стеке лежат затравки отрезков: отрезок строки расширяется до границ
+    поиском по срезу, соседние строки в его пределах дают по одной
+    затравке на каждый свободный участок.
+    """
+    height, width = blocked.shape
+    free = blocked == 0
+    filled = np.zeros((height, width), dtype=bool)
+    if not (0 <= x < width and 0 <= y < height) or not free[y, x]:
+        return filled
+
+    stack = [(x, y)]
+    while stack:
+        x, y = stack.pop()
+        row = free[y]
+        if not row[x]:
+            continue
+
+        # Первый занятый пиксель слева и справа от затравки
+        left_run = row[x::-1]
+        left = np.argmin(left_run)
+        if left_run[left]:
+            left = len(left_run)
+        right_run = row[x:]
+        right = np.argmin(right_run)
+        if right_run[right]:
+            right = len(right_run)
+        left, right = x - left + 1, x + right
+
+        row[left:right] = False
+        filled[y, left:right] = True
+
+        for ny in (y - 1, y + 1):
+            if 0 <= ny < height:
+                segment = free[ny, left:right]
+                starts = np.flatnonzero(segment[1:] & ~segment[:-1]) + 1
+                if segment[0]:
+                    stack.append((left, ny))
+                stack.extend(zip((left + starts).tolist(), [ny] * len(starts)))
+    return filled
+
+
+def stamp_brush(mask, x, y, radius):
+    """Отмечает в mask круг кисти радиуса radius с центром (x, y)."""
+    height, width = mask.shape
+    yy, xx = np.ogrid[-radius : radius + 1, -radius : radius + 1]
+    brush = xx * xx + yy * yy <= radius * radius
+    x0, y0 = max(x - radius, 0), max(y - radius, 0)
+    x1, y1 = min(x + radius + 1, width), min(y + radius + 1, height)
+    if x0 < x1 and y0 < y1:
+        mask[y0:y1, x0:x1] |= brush[
+            y0 - y + radius : y1 - y + radius, x0 - x + radius : x1 - x + radius
+        ]
 
 
 class Task1Window:
@@ -59,6 +118,61 @@ class Task1Window:
         task1a_window = Task1cWindow(root=child, parent=self)
 
 
+def fill_with_pattern(frame_buffer, mask, pattern):
+    """
+    Копирует в пиксели mask узор, замощающий плоскость от начала
+    координат: пиксель (x, y) берётся из pattern[y % h, x % w].
+    Если узор целиком накрывает область, он берётся срезом, иначе
+    строки и столбцы выбираются модульными индексами.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if len(rows) == 0:
+        return frame_buffer
+    y0, y1 = rows[0], rows[-1] + 1
+    x0, x1 = cols[0], cols[-1] + 1
+
+    pattern_height, pattern_width = pattern.shape[:2]
+    if y1 <= pattern_height and x1 <= pattern_width:
+        tile = pattern[y0:y1, x0:x1]
+    else:
+        tile = pattern.take(np.arange(y0, y1), axis=0, mode="wrap")
+        tile = tile.take(np.arange(x0, x1), axis=1, mode="wrap")
+    np.copyto(
+        frame_buffer[y0:y1, x0:x1], tile, where=mask[y0:y1, x0:x1, np.newaxis]
+    )
+    return frame_buffer
+
+
+def get_color_mask(image_array, color, threshold):
+    """
+    Маска пикселей, чей цвет отстоит от color не дальше threshold
+    (евклидово расстояние в RGB, сравниваются квадраты без корня).
+    threshold = 0 оставляет только точное совпадение.
+    """
+    distance = np.zeros(image_array.shape[:2], dtype=np.int32)
+    for channel in range(3):
+        difference = image_array[:, :, channel].astype(np.int32) - int(color[channel])
+        distance += difference * difference
+    return distance <= threshold * threshold
+
+
+def get_region_boundary(region):
+    """
+    Граница области: её пиксели, у которых хотя бы один из четырёх
+    соседей лежит вне области или за краем изображения.
+    """
+    inner = np.zeros_like(region)
+    inner[1:-1, 1:-1] = (
+        region[1:-1, 1:-1]
+        & region[:-2, 1:-1]
+        & region[2:, 1:-1]
+        & region[1:-1, :-2]
+        & region[1:-1, 2:]
+    )
+    return region & ~inner
+
+
 class Task1aWindow:
     def __init__(self, root: tk.Tk, parent):
         self.root = root
@@ -69,10 +183,15 @@ class Task1aWindow:
         self.root.title("task1a")
         self.canvas = tk.Canvas(self.root, width=self.width, height=self.height)
 
-        self.frames_for_update = 1000
+        self.fill_color = (255, 0, 0)
 
-        self.boarders = set()
-        self.passed_val = set()
+        # Граница — маска кисти, заливка — буфер, выводимый одним изображением
+        self.border_mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.frame_buffer = np.full((self.height, self.width, 3), 255, dtype=np.uint8)
+        self.image_tk = ImageTk.PhotoImage(
+            Image.fromarray(self.frame_buffer), master=self.root
+        )
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
 
         self.fill_button = tk.Button(
             root,
@@ -91,117 +210,16 @@ class Task1aWindow:
 
     def fill(self):
         self.canvas.unbind("<B1-Motion>")
-        self.canvas.bind("<B1-Motion>", self.stack_fill_lines)
-
-    def check_validity(self, x, y):
-        if (
-            (x, y) not in self.boarders
-            and (x, y) not in self.passed_val
-            and x > 0
-            and x < self.width - 2
-            and y > 0
-            and y < self.height - 2
-        ):
-            return True
-        else:
-            return False
+        self.canvas.bind("<B1-Motion>", self.fill_area)
 
-    def stack_fill(self, event):
+    def fill_area(self, event):
         self.canvas.unbind("<B1-Motion>")
-        x_start, y_start = event.x, event.y
-        stack = [(x_start, y_start)]
-        frames_count = 0
-        while stack:
-            frames_count += 1
-            x, y = stack.pop()
-            self.canvas.create_oval(x, y, x + 1, y + 1, fill="red", outline="red")
-            if frames_count % self.frames_for_update == 0:
-                self.root.update()
-            if self.check_validity(x + 1, y):
-                self.passed_val.add((x + 1, y))
-                stack.append((x + 1, y))
-
-            if self.check_validity(x - 1, y):
-                self.passed_val.add((x - 1, y))
-                stack.append((x - 1, y))
-
-            if self.check_validity(x, y + 1):
-                self.passed_val.add((x, y + 1))
-                stack.append((x, y + 1))
-
-            if self.check_validity(x, y - 1):
-                self.passed_val.add((x, y - 1))
-                stack.append((x, y - 1))
+        filled = span_fill(self.border_mask, event.x, event.y)
+        self.frame_buffer[filled] = self.fill_color
+        self.image_tk.paste(Image.fromarray(self.frame_buffer))
 
         print("Done")
         self.canvas.bind("<B1-Motion>", self.paint)
-        return
-
-    def stack_fill_lines(self, event):
-        self.canvas.unbind("<B1-Motion>")
-        x_start, y_start = event.x, event.y
-        stack = [(x_start, y_start)]
-        pixel_count = 0
-
-        while stack:
-            pixel_count += 1
-            x, y = stack.pop()
-
-            x_left = x
-            while self.check_validity(x_left - 1, y):
-                x_left -= 1
-
-            x_right = x
-            while self.check_validity(x_right + 1, y):
-                x_right += 1
-
-            self.canvas.create_line(x_left, y, x_right, y, fill="red")
-
-            for nx in range(x_left, x_right + 1):
-                self.passed_val.add((nx, y))
-
-            if pixel_count % self.frames_for_update == 0:
-                self.root.update()
-
-            for nx in range(x_left, x_right + 1):
-                if self.check_validity(nx, y + 1):
-                    stack.append((nx, y + 1))
-
-                if self.check_validity(nx, y - 1):
-                    stack.append((nx, y - 1))
-
-        print("Done")
-        self.canvas.bind("<B1-Motion>", self.paint)
-
-    def rec_fill(self, event):
-        passed_val = set()
-        self.canvas.unbind("<B1-Motion>")
-        x_start, y_start = event.x, event.y
-
-        def f(self: Task1aWindow, x, y):
-            self.canvas.create_oval(x, y, x + 1, y + 1, fill="red", outline="red")
-            self.canvas.update()
-
-            if self.check_validity(x + 1, y):
-                passed_val.add((x + 1, y))
-                f(self, x + 1, y)
-
-            if self.check_validity(x - 1, y):
-                passed_val.add((x - 1, y))
-                f(self, x - 1, y)
-
-            if self.check_validity(x, y + 1):
-                passed_val.add((x, y + 1))
-                f(self, x, y + 1)
-
-            if self.check_validity(x, y - 1):
-                passed_val.add((x, y - 1))
-                f(self, x, y - 1)
-
-        f(self=self, x=x_start, y=y_start)
-        print("Done")
-        self.canvas.bind("<B1-Motion>", self.paint)
-        return
 
     def paint(self, event):
         self.last_x, self.last_y = event.x, event.y
@@ -215,15 +233,7 @@ class Task1aWindow:
             fill="black",
             outline="black",
         )
-
-        for x in range(self.last_x - oval_size // 2, self.last_x + oval_size // 2 + 1):
-            for y in range(
-                self.last_y - oval_size // 2, self.last_y + oval_size // 2 + 1
-            ):
-                if (x - self.last_x) ** 2 + (y - self.last_y) ** 2 <= (
-                    oval_size // 2
-                ) ** 2:
-                    self.boarders.add((x, y))
+        stamp_brush(self.border_mask, self.last_x, self.last_y, oval_size // 2)
 
 
 class Task1bWindow:
@@ -238,10 +248,14 @@ class Task1bWindow:
         self.canvas = tk.Canvas(self.root, width=self.width, height=self.height)
         self.image_path = ""
         self.image = None
-        self.frames_for_update = 1000
+        self.pattern = None
 
-        self.boarders = set()
-        self.passed_val = set()
+        self.border_mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.frame_buffer = np.full((self.height, self.width, 3), 255, dtype=np.uint8)
+        self.image_tk = ImageTk.PhotoImage(
+            Image.fromarray(self.frame_buffer), master=self.root
+        )
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
 
         self.fill_button = tk.Button(
             root,
@@ -275,97 +289,20 @@ class Task1bWindow:
         if filename:
             self.image_path = filename
             self.image = Image.open(self.image_path)
+            self.pattern = np.array(self.image.convert("RGB"))
 
     def fill(self):
         self.canvas.unbind("<B1-Motion>")
-        self.canvas.bind("<B1-Motion>", self.stack_fill_lines)
-
-    def check_validity(self, x, y):
-        if (
-            (x, y) not in self.boarders
-            and (x, y) not in self.passed_val
-            and x > 0
-            and x < self.width - 2
-            and y > 0
-            and y < self.height - 2
-        ):
-            return True
-        else:
-            return False
-
-    def get_hex_pixel(self, x, y):
-        r, g, b = self.image.getpixel((x % self.image.width, y % self.image.height))
-        return "#{:02x}{:02x}{:02x}".format(r, g, b)
-
-    def stack_fill(self, event):
-        self.canvas.unbind("<B1-Motion>")
-        x_start, y_start = event.x, event.y
-        stack = [(x_start, y_start)]
-
-        frame_count = 0
-        while stack:
-            frame_count += 1
-            x, y = stack.pop()
-            color = self.get_hex_pixel(x, y)
-            self.canvas.create_oval(x, y, x + 1, y + 1, fill=color, outline=color)
-            if frame_count % self.frames_for_update == 0:
-                self.canvas.update()
-            if self.check_validity(x + 1, y):
-                self.passed_val.add((x + 1, y))
-                stack.append((x + 1, y))
-
-            if self.check_validity(x - 1, y):
-                self.passed_val.add((x - 1, y))
-                stack.append((x - 1, y))
-
-            if self.check_validity(x, y + 1):
-                self.passed_val.add((x, y + 1))
-                stack.append((x, y + 1))
-
-            if self.check_validity(x, y - 1):
-                self.passed_val.add((x, y - 1))
-                stack.append((x, y - 1))
-
-        print("Done")
-        self.canvas.bind("<B1-Motion>", self.paint)
-        return
+        self.canvas.bind("<B1-Motion>", self.fill_area)
 
-    def stack_fill_lines(self, event):
+    def fill_area(self, event):
+        if self.pattern is None:
+            print("Choose a pattern image first")
+            return
         self.canvas.unbind("<B1-Motion>")
-        x_start, y_start = event.x, event.y
-        stack = [(x_start, y_start)]
-        pixel_count = 0
-
-        while stack:
-            pixel_count += 1
-            x, y = stack.pop()
-
-            x_left = x
-            while self.check_validity(x_left - 1, y):
-                x_left -= 1
-
-            x_right = x
-            while self.check_validity(x_right + 1, y):
-                x_right += 1
-
-            for nx in range(x_left, x_right + 1):
-                img_color = self.get_hex_pixel(nx, y)
-                self.canvas.create_oval(
-                    nx, y, nx + 1, y + 1, fill=img_color, outline=img_color
-                )
-
-            for nx in range(x_left, x_right + 1):
-                self.passed_val.add((nx, y))
-
-            if pixel_count % self.frames_for_update == 0:
-                self.root.update()
-
-            for nx in range(x_left, x_right + 1):
-                if self.check_validity(nx, y + 1):
-                    stack.append((nx, y + 1))
-
-                if self.check_validity(nx, y - 1):
-                    stack.append((nx, y - 1))
+        filled = span_fill(self.border_mask, event.x, event.y)
+        fill_with_pattern(self.frame_buffer, filled, self.pattern)
+        self.image_tk.paste(Image.fromarray(self.frame_buffer))
 
         print("Done")
         self.canvas.bind("<B1-Motion>", self.paint)
@@ -382,15 +319,7 @@ class Task1bWindow:
             fill="black",
             outline="black",
         )
-
-        for x in range(self.last_x - oval_size // 2, self.last_x + oval_size // 2 + 1):
-            for y in range(
-                self.last_y - oval_size // 2, self.last_y + oval_size // 2 + 1
-            ):
-                if (x - self.last_x) ** 2 + (y - self.last_y) ** 2 <= (
-                    oval_size // 2
-                ) ** 2:
-                    self.boarders.add((x, y))
+        stamp_brush(self.border_mask, self.last_x, self.last_y, oval_size // 2)
 
 
 class Task1cWindow:
@@ -398,15 +327,11 @@ class Task1cWindow:
         self.root = root
         self.parent = parent
         self.root.configure(bg=parent.back_ground)
-        self.frames_for_update = 10000
-        self.passed_val = set()
-        self.color_for_fill = "#00CCCC"
+        self.color_for_fill = (0x00, 0xCC, 0xCC)
+        self.threshold = 50
 
         self.root.title("Task1c")
 
-        self.image_tk = None
-        self.image = None
-
         self.browse_button = tk.Button(
             root,
             text="Browse Image",
@@ -421,6 +346,8 @@ class Task1cWindow:
         self.canvas.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
         self.image_tk = None
         self.image = None
+        self.image_array = None
+        self.frame_buffer = None
         self.canvas.bind("<B1-Motion>", self.connected_area)
 
     def browse_file(self):
@@ -429,7 +356,7 @@ class Task1cWindow:
         )
         if filename:
             self.image_path = filename
-            self.image = Image.open(self.image_path)
+            self.image = Image.open(self.image_path).convert("RGB")
 
             # Resize the image if necessary
             max_size = 500
@@ -438,110 +365,36 @@ class Task1cWindow:
                 new_width = int(self.image.width * ratio)
                 new_height = int(self.image.height * ratio)
                 self.image = self.image.resize((new_width, new_height), Image.LANCZOS)
-                self.width, self.height = self.image.size
-                self.canvas.config(width=self.width, height=self.height)
-                self.canvas.delete("all")
-                self.draw_image()
-            else:
 
-                self.width, self.height = self.image.size
-                self.canvas.config(width=self.width, height=self.height)
-                self.canvas.delete("all")
-                self.draw_image()
+            self.width, self.height = self.image.size
+            self.image_array = np.array(self.image)
+            self.canvas.config(width=self.width, height=self.height)
+            self.canvas.delete("all")
+            self.draw_image()
 
     def draw_image(self):
-        frames_count = 0
-        for x in range(self.width):
-            for y in range(self.height):
-                frames_count += 1
-                if frames_count % self.frames_for_update == 0:
-                    self.root.update()
-                r, g, b = self.image.getpixel((x, y))
-                hex_color = f"#{r:02x}{g:02x}{b:02x}"
-
-                self.canvas.create_rectangle(
-                    x, y, x + 1, y + 1, outline=hex_color, fill=hex_color
-                )
-
-    def check_validity_and_color(self, x, y, color):
-        if (
-            (x, y) not in self.passed_val
-            and 0 <= x < self.width
-            and 0 <= y < self.height
-        ):
-            r, g, b = self.image.getpixel((x, y))
-            current_color = f"#{r:02x}{g:02x}{b:02x}"
-
-            return current_color == color
-        else:
-            return False
-
-    def check_validity_and_color_in_range(self, x, y, color, threshold=50):
-        if (
-            (x, y) not in self.passed_val
-            and 0 <= x < self.width
-            and 0 <= y < self.height
-        ):
-            r, g, b = self.image.getpixel((x, y))
-            current_color = (r, g, b)
-
-            target_r = int(color[1:3], 16)
-            target_g = int(color[3:5], 16)
-            target_b = int(color[5:7], 16)
-            color_rgb = (target_r, target_g, target_b)
-
-            distance = math.sqrt(
-                (current_color[0] - color_rgb[0]) ** 2
-                + (current_color[1] - color_rgb[1]) ** 2
-                + (current_color[2] - color_rgb[2]) ** 2
-            )
-
-            return distance <= threshold
-        else:
-            return False
+        """Изображение выводится одним PhotoImage, границы дорисовываются в буфер."""
+        self.frame_buffer = self.image_array.copy()
+        self.image_tk = ImageTk.PhotoImage(
+            Image.fromarray(self.frame_buffer), master=self.root
+        )
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image_tk)
 
     def connected_area(self, event):
-        # check_function = self.check_validity_and_color
-        check_function = self.check_validity_and_color_in_range
+        x, y = event.x, event.y
+        if self.image_array is None or not (
+            0 <= x < self.width and 0 <= y < self.height
+        ):
+            return
         self.canvas.unbind("<B1-Motion>")
-        x_start, y_start = event.x, event.y
-
-        r, g, b = self.image.getpixel((x_start, y_start))
-        color = f"#{r:02x}{g:02x}{b:02x}"
-
-        stack = [(x_start, y_start)]
-        self.passed_val.add((x_start, y_start))
-
-        frames_count = 0
-        while stack:
-            x, y = stack.pop()
-            self.canvas.create_oval(
-                x,
-                y,
-                x + 1,
-                y + 1,
-                fill=self.color_for_fill,
-                outline=self.color_for_fill,
-            )
-            frames_count += 1
-            if frames_count % (self.frames_for_update // 10) == 0:
-                self.root.update()
-
-            if check_function(x + 1, y, color):
-                self.passed_val.add((x + 1, y))
-                stack.append((x + 1, y))
-
-            if check_function(x - 1, y, color):
-                self.passed_val.add((x - 1, y))
-                stack.append((x - 1, y))
-
-            if check_function(x, y + 1, color):
-                self.passed_val.add((x, y + 1))
-                stack.append((x, y + 1))
-
-            if check_function(x, y - 1, color):
-                self.passed_val.add((x, y - 1))
-                stack.append((x, y - 1))
+
+        # Маска допуска по цвету затравки считается сразу для всего изображения
+        color = self.image_array[y, x]
+        similar = get_color_mask(self.image_array, color, self.threshold)
+        region = span_fill(~similar, x, y)
+
+        self.frame_buffer[get_region_boundary(region)] = self.color_for_fill
+        self.image_tk.paste(Image.fromarray(self.frame_buffer))
 
         print("Done")
         self.canvas.bind("<B1-Motion>", self.connected_area)
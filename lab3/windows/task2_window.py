@@ -1,5 +1,115 @@
 import tkinter as tk
-from PIL import Image, ImageDraw, ImageTk
+import numpy as np
+from PIL import Image, ImageTk
+
+
+def get_line_steps(lengths):
+    """
+    Номера отрезков и шаги вдоль главной оси для всех пикселей сразу:
+    отрезок i даёт шаги 0 .. lengths[i] - 1.
+    """
+    segment_ids = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    steps = np.arange(len(segment_ids)) - np.repeat(starts, lengths)
+    return segment_ids, steps
+
+
+def bresenham_lines(segments):
+    """
+    Пиксели N отрезков (N, 4) = x1, y1, x2, y2 по Брезенхему разом.
+
+    Смещение по второстепенной оси на шаге i равно
+    ceil((2 * i * d_minor - d_major) / (2 * d_major)): это та же точка,
+    которую даёт целочисленный цикл с ошибкой err = dx - dy.
+    Возвращает массивы xs, ys.
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    x1, y1, x2, y2 = segments.T
+    dx, dy = np.abs(x2 - x1), np.abs(y2 - y1)
+    sx = np.where(x1 < x2, 1, -1)
+    sy = np.where(y1 < y2, 1, -1)
+    major = np.maximum(dx, dy)
+    minor = np.minimum(dx, dy)
+
+    ids, steps = get_line_steps(major + 1)
+    d_major = np.maximum(major[ids], 1)
+    offset = -((d_major - 2 * steps * minor[ids]) // (2 * d_major))
+    x_major = dx[ids] >= dy[ids]
+    xs = x1[ids] + sx[ids] * np.where(x_major, steps, offset)
+    ys = y1[ids] + sy[ids] * np.where(x_major, offset, steps)
+    return xs, ys
+
+
+def wu_lines(segments):
+    """
+    Пиксели N отрезков по Ву разом: на каждом шаге вдоль главной оси
+    два пикселя с покрытием 1 - frac и frac. Возвращает xs, ys, coverage.
+    """
+    segments = np.asarray(segments, dtype=np.int64).reshape(-1, 4)
+    x1, y1, x2, y2 = segments.T
+    x_major = np.abs(x2 - x1) > np.abs(y2 - y1)
+
+    # Главная ось всегда идёт по возрастанию
+    major_1 = np.where(x_major, x1, y1)
+    major_2 = np.where(x_major, x2, y2)
+    minor_1 = np.where(x_major, y1, x1)
+    minor_2 = np.where(x_major, y2, x2)
+    swap = major_1 > major_2
+    major_1, major_2 = np.minimum(major_1, major_2), np.maximum(major_1, major_2)
+    minor_1, minor_2 = (
+        np.where(swap, minor_2, minor_1),
+        np.where(swap, minor_1, minor_2),
+    )
+    length = major_2 - major_1
+    gradient = (minor_2 - minor_1) / np.maximum(length, 1)
+
+    ids, steps = get_line_steps(length + 1)
+    position = minor_1[ids] + steps * gradient[ids]
+    base = np.floor(position)
+    frac = position - base
+    major = major_1[ids] + steps
+    base = base.astype(np.int64)
+
+    along_x = x_major[ids]
+    xs = np.concatenate(
+        [np.where(along_x, major, base), np.where(along_x, major, base + 1)]
+    )
+    ys = np.concatenate(
+        [np.where(along_x, base, major), np.where(along_x, base + 1, major)]
+    )
+    return xs, ys, np.concatenate([1 - frac, frac])
+
+
+def get_pixel_indices(xs, ys, width, height):
+    """Плоские индексы пикселей внутри буфера и маска попавших в него."""
+    inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    return ys[inside] * width + xs[inside], inside
+
+
+def draw_bresenham_lines(buffer, segments):
+    """Рисует отрезки чёрным в полутоновый буфер (h, w) uint8."""
+    height, width = buffer.shape
+    indices, inside = get_pixel_indices(*bresenham_lines(segments), width, height)
+    buffer.reshape(-1)[indices] = 0
+    return buffer
+
+
+def add_wu_lines(coverage, segments):
+    """
+    Накапливает покрытие отрезков Ву в coverage (h, w) float32: вклады
+    пересекающихся линий складываются, как при np.add.at.
+    """
+    height, width = coverage.shape
+    xs, ys, weights = wu_lines(segments)
+    indices, inside = get_pixel_indices(xs, ys, width, height)
+    totals = np.bincount(indices, weights[inside], minlength=width * height)
+    coverage += totals.reshape(height, width).astype(np.float32)
+    return coverage
+
+
+def get_wu_image(coverage):
+    """Покрытие в полутоновое изображение: 0 — белый, 1 и больше — чёрный."""
+    return (255 * (1 - np.clip(coverage, 0, 1))).astype(np.uint8)
 
 
 class Task2Window:
@@ -27,9 +137,15 @@ class Task2Window:
         self.root.grid_columnconfigure(1, weight=1)
 
         self.root.bind("<Configure>", self.on_resize)
+        self.pending_resize = None
 
-        self.image_bresenham = None
-        self.image_wu = None
+        # Буферы размером с холст: Брезенхем — яркость, Ву — покрытие
+        self.buffer_bresenham = None
+        self.coverage_wu = None
+        self.tk_image_bresenham = None
+        self.tk_image_wu = None
+        self.image_item_bresenham = None
+        self.image_item_wu = None
 
         self.current_point_bresenham = None
         self.current_point_wu = None
@@ -43,98 +159,56 @@ class Task2Window:
         self.draw_segments()
 
     def draw_segments(self):
-        width = self.canvas_bresenham.winfo_width()
-        height = self.canvas_bresenham.winfo_height()
+        """Перерисовывает все отрезки одним пакетом на каждый алгоритм."""
+        width = max(self.canvas_bresenham.winfo_width(), 1)
+        height = max(self.canvas_bresenham.winfo_height(), 1)
 
-        self.image_bresenham = Image.new("RGB", (width, height), "white")
-        self.image_wu = Image.new("RGBA", (width, height), "white")
-
-        for line in self.lines_bresenham:
-            self.draw_bresenham(self.image_bresenham, *line)
-        for line in self.lines_wu:
-            self.draw_wu(self.image_wu, *line)
+        self.buffer_bresenham = np.full((height, width), 255, dtype=np.uint8)
+        self.coverage_wu = np.zeros((height, width), dtype=np.float32)
+        draw_bresenham_lines(self.buffer_bresenham, self.lines_bresenham)
+        add_wu_lines(self.coverage_wu, self.lines_wu)
 
         self.update_canvas()
 
-    def draw_bresenham(self, image, x1, y1, x2, y2):
-        draw = ImageDraw.Draw(image)
-        points = self.bresenham(int(x1), int(y1), int(x2), int(y2))
-        for x, y in points:
-            draw.point((x, y), fill="black")
-
-    def draw_wu(self, image, x1, y1, x2, y2):
-        draw = ImageDraw.Draw(image)
-        points = self.wu(int(x1), int(y1), int(x2), int(y2))
-        for x, y, brightness in points:
-            color = f"#{int(brightness * 255):02x}{int(brightness * 255):02x}{int(brightness * 255):02x}"
-            draw.point((x, y), fill=(0, 0, 0, int(brightness * 255)))
-
-    def bresenham(self, x1, y1, x2, y2):
-        points = []
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
-        sx = 1 if x1 < x2 else -1
-        sy = 1 if y1 < y2 else -1
-        err = dx - dy
-
-        while True:
-            points.append((x1, y1))
-            if x1 == x2 and y1 == y2:
-                break
-            err2 = err * 2
-            if err2 > -dy:
-                err -= dy
-                x1 += sx
-            if err2 < dx:
-                err += dx
-                y1 += sy
-        return points
-
-    def wu(self, x1, y1, x2, y2):
-        points = []
-        dx = x2 - x1
-        dy = y2 - y1
-        gradient = dy / dx if dx != 0 else 0
-
-        if abs(dx) > abs(dy):
-            if x1 > x2:
-                x1, x2 = x2, x1
-                y1, y2 = y2, y1
-
-            y = y1
-            for x in range(x1, x2 + 1):
-                brightness = 1 - (y - int(y))
-                points.append((x, int(y), brightness))
-                points.append((x, int(y) + 1, 1 - brightness))
-                y += gradient
-        else:
-            if y1 > y2:
-                x1, x2 = x2, x1
-                y1, y2 = y2, y1
-
-            x = x1
-            for y in range(y1, y2 + 1):
-                brightness = 1 - (x - int(x))
-                points.append((int(x), y, brightness))
-                points.append((int(x) + 1, y, 1 - brightness))
-                x += 1 / gradient if gradient != 0 else 0
-
-        return points
-
     def on_resize(self, event):
-        self.draw_segments()
+        """<Configure> приходит пачками и от дочерних виджетов: одна перерисовка."""
+        if self.pending_resize is None:
+            self.pending_resize = self.root.after_idle(self.resize)
+
+    def resize(self):
+        self.pending_resize = None
+        size = (
+            max(self.canvas_bresenham.winfo_height(), 1),
+            max(self.canvas_bresenham.winfo_width(), 1),
+        )
+        if self.buffer_bresenham is None or self.buffer_bresenham.shape != size:
+            self.draw_segments()
 
     def update_canvas(self):
-        if self.image_bresenham:
-            self.tk_image_bresenham = ImageTk.PhotoImage(self.image_bresenham)
-            self.canvas_bresenham.create_image(
+        image_bresenham = Image.fromarray(self.buffer_bresenham)
+        image_wu = Image.fromarray(get_wu_image(self.coverage_wu))
+
+        # PhotoImage пересоздаётся только при смене размера
+        if (
+            self.tk_image_bresenham is None
+            or self.tk_image_bresenham.width() != image_bresenham.width
+            or self.tk_image_bresenham.height() != image_bresenham.height
+        ):
+            self.tk_image_bresenham = ImageTk.PhotoImage(
+                image_bresenham, master=self.root
+            )
+            self.tk_image_wu = ImageTk.PhotoImage(image_wu, master=self.root)
+            self.canvas_bresenham.delete("all")
+            self.canvas_wu.delete("all")
+            self.image_item_bresenham = self.canvas_bresenham.create_image(
                 0, 0, anchor="nw", image=self.tk_image_bresenham
             )
-            self.canvas_bresenham.image = self.tk_image_bresenham
-        if self.image_wu:
-            self.tk_image_wu = ImageTk.PhotoImage(self.image_wu)
-            self.canvas_wu.create_image(0, 0, anchor="nw", image=self.tk_image_wu)
-            self.canvas_wu.image = self.tk_image_wu
+            self.image_item_wu = self.canvas_wu.create_image(
+                0, 0, anchor="nw", image=self.tk_image_wu
+            )
+        else:
+            self.tk_image_bresenham.paste(image_bresenham)
+            self.tk_image_wu.paste(image_wu)
 
     def on_click_bresenham(self, event):
         if self.current_point_bresenham is None:
@@ -142,7 +216,7 @@ class Task2Window:
         else:
             x1, y1 = self.current_point_bresenham
             x2, y2 = event.x, event.y
-            self.draw_bresenham(self.image_bresenham, x1, y1, x2, y2)
+            draw_bresenham_lines(self.buffer_bresenham, [(x1, y1, x2, y2)])
             self.lines_bresenham.append((x1, y1, x2, y2))
             self.current_point_bresenham = (x2, y2)
             self.update_canvas()
@@ -153,7 +227,7 @@ class Task2Window:
         else:
             x1, y1 = self.current_point_wu
             x2, y2 = event.x, event.y
-            self.draw_wu(self.image_wu, x1, y1, x2, y2)
+            add_wu_lines(self.coverage_wu, [(x1, y1, x2, y2)])
             self.lines_wu.append((x1, y1, x2, y2))
             self.current_point_wu = (x2, y2)
             self.update_canvas()
@@ -5,6 +5,64 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.tri import Triangulation
 
 
+CANVAS_SIZE = 400
+BAND_PIXELS = 1 << 18  # Пикселей ограничивающего прямоугольника за один проход
+
+
+def fill_gradient_triangles(image, triangles, colors):
+    """
+    Закрашивает треугольники с интерполяцией цвета по вершинам.
+
+    image (h, w, C) — буфер, triangles (N, 3, 2) — вершины в пикселях,
+    colors (N, 3, C) — цвета вершин. Барицентрические координаты целых
+    точек считаются функциями рёбер сразу для полосы строк ограничивающего
+    прямоугольника; точка внутри, если все три координаты >= 0.
+    Треугольники рисуются по порядку, поздние поверх ранних.
+    """
+    triangles = np.asarray(triangles, dtype=np.float64).reshape(-1, 3, 2)
+    colors = np.asarray(colors, dtype=np.float64).reshape(len(triangles), 3, -1)
+    height, width = image.shape[:2]
+
+    for (a, b, c), vertex_colors in zip(triangles, colors):
+        area = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+        if area == 0:
+            continue
+
+        x0 = max(int(np.floor(min(a[0], b[0], c[0]))), 0)
+        x1 = min(int(np.ceil(max(a[0], b[0], c[0]))) + 1, width)
+        y0 = max(int(np.floor(min(a[1], b[1], c[1]))), 0)
+        y1 = min(int(np.ceil(max(a[1], b[1], c[1]))) + 1, height)
+        if x0 >= x1 or y0 >= y1:
+            continue
+
+        # Функция ребра напротив вершины — линейная: e = A * x + B * y + C
+        edges = np.array(
+            [
+                [b[1] - c[1], c[0] - b[0], b[0] * c[1] - c[0] * b[1]],
+                [c[1] - a[1], a[0] - c[0], c[0] * a[1] - a[0] * c[1]],
+                [a[1] - b[1], b[0] - a[0], a[0] * b[1] - b[0] * a[1]],
+            ]
+        ) / area
+        xs = np.arange(x0, x1, dtype=np.float64)
+        band = max(1, BAND_PIXELS // (x1 - x0))
+
+        for top in range(y0, y1, band):
+            ys = np.arange(top, min(top + band, y1), dtype=np.float64)
+            weights = (
+                edges[:, 0, None, None] * xs
+                + edges[:, 1, None, None] * ys[:, None]
+                + edges[:, 2, None, None]
+            )
+            inside = (weights >= 0).all(axis=0)
+            if not inside.any():
+                continue
+            interpolated = np.tensordot(
+                weights[:, inside], vertex_colors, axes=(0, 0)
+            )
+            image[top : top + len(ys), x0:x1][inside] = interpolated
+    return image
+
+
 class Task3Window:
     def __init__(self, root: tk.Tk, parent):
         self.root = root
@@ -62,49 +120,19 @@ class Task3Window:
             ]
         )
 
+        # Весь треугольник растеризуется в массив и выводится одним изображением
+        image = np.ones((CANVAS_SIZE, CANVAS_SIZE, 3))
+        fill_gradient_triangles(image, triangle[None], vertex_colors[None])
+        np.clip(image, 0, 1, out=image)
+
         fig, ax = plt.subplots(figsize=(6, 6))
-        ax.set_xlim(0, 400)
-        ax.set_ylim(0, 400)
-
-        # Функция для вычисления барицентрических координат
-        def barycentric_coords(p, a, b, c):
-            v0 = b - a
-            v1 = c - a
-            v2 = p - a
-            d00 = np.dot(v0, v0)
-            d01 = np.dot(v0, v1)
-            d11 = np.dot(v1, v1)
-            d20 = np.dot(v2, v0)
-            d21 = np.dot(v2, v1)
-            denom = d00 * d11 - d01 * d01
-            v = (d11 * d20 - d01 * d21) / denom
-            w = (d00 * d21 - d01 * d20) / denom
-            u = 1.0 - v - w
-            return u, v, w
-
-        # Определяем границы треугольника
-        min_x, min_y = np.min(triangle, axis=0).astype(int)
-        max_x, max_y = np.max(triangle, axis=0).astype(int)
-
-        # Проходим по всем точкам внутри ограничивающего прямоугольника
-        for x in range(min_x, max_x):
-            for y in range(min_y, max_y):
-                point = np.array([x, y])
-                u, v, w = barycentric_coords(
-                    point, triangle[0], triangle[1], triangle[2]
-                )
-
-                # Если точка внутри треугольника (все барицентрические координаты >= 0)
-                if u >= 0 and v >= 0 and w >= 0:
-                    # Интерполируем цвет на основе барицентрических координат
-                    color = (
-                        u * vertex_colors[0]
-                        + v * vertex_colors[1]
-                        + w * vertex_colors[2]
-                    )
-                    ax.add_patch(plt.Circle((x, y), 0.5, color=color, lw=0))
-
-        ax.invert_yaxis()
+        ax.imshow(
+            image,
+            extent=(-0.5, CANVAS_SIZE - 0.5, CANVAS_SIZE - 0.5, -0.5),
+            interpolation="nearest",
+        )
+        ax.set_xlim(0, CANVAS_SIZE)
+        ax.set_ylim(CANVAS_SIZE, 0)
         ax.axis("off")
 
         for widget in self.canvas_frame.winfo_children():
@@ -3,6 +3,441 @@ import numpy as np
 from math import cos, sin, radians
 
 
+class Polygon:
+    """
+    Вершины полигона — массив float (n, 2), и стек аффинных
+    преобразований 3x3. Преобразования только перемножаются, матрица
+    применяется к вершинам, когда нужны координаты: для отрисовки и
+    проверок. Кэш координат, ограничивающего прямоугольника и рёбер,
+    разложенных по горизонтальным полосам, сбрасывается при любом изменении.
+    """
+
+    def __init__(self, points=None):
+        if points is None:
+            points = []
+        self.vertices = np.array(points, dtype=float).reshape(-1, 2)
+        # Композиции преобразований: действует последняя, отмена снимает её
+        self.matrices = [np.eye(3)]
+        self.invalidate()
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __getitem__(self, index):
+        return self.points[index]
+
+    @property
+    def points(self):
+        """Координаты вершин на сцене списком кортежей (x, y)."""
+        if self.point_list is None:
+            self.point_list = [tuple(point) for point in self.get_coords().tolist()]
+        return self.point_list
+
+    def append(self, point):
+        """
+        Вершина задаётся в координатах сцены, поэтому накопленные
+        преобразования сначала переносятся в сами вершины.
+        """
+        self.vertices = np.vstack([self.get_coords(), point])
+        self.matrices = [np.eye(3)]
+        self.invalidate()
+
+    def set_points(self, points):
+        self.vertices = np.array(points, dtype=float).reshape(-1, 2)
+        self.matrices = [np.eye(3)]
+        self.invalidate()
+
+    def push_transform(self, matrix):
+        """Добавляет преобразование: одно произведение матриц 3x3."""
+        self.matrices.append(matrix @ self.matrices[-1])
+        self.invalidate()
+
+    def pop_transform(self):
+        """Отменяет последнее преобразование, False если отменять нечего."""
+        if len(self.matrices) == 1:
+            return False
+        self.matrices.pop()
+        self.invalidate()
+        return True
+
+    def invalidate(self):
+        self.coords = None
+        self.point_list = None
+        self.bbox = None
+        self.slabs = None
+
+    def get_coords(self):
+        """Вершины (n, 2) после всех преобразований, считаются по требованию."""
+        if self.coords is None:
+            if len(self.matrices) == 1:
+                self.coords = self.vertices
+            else:
+                matrix = self.matrices[-1]
+                self.coords = self.vertices @ matrix[:2, :2].T + matrix[:2, 2]
+        return self.coords
+
+    def get_bbox(self):
+        """(min_x, min_y, max_x, max_y), считается один раз до изменения."""
+        if self.bbox is None:
+            coords = self.get_coords()
+            self.bbox = (*coords.min(axis=0).tolist(), *coords.max(axis=0).tolist())
+        return self.bbox
+
+    def get_slabs(self):
+        """
+        Полосы по y: около sqrt(n) полос равной высоты, для каждой —
+        номера рёбер, чей диапазон по y её задевает. Возвращает
+        (начала рёбер, концы рёбер, высота полосы, рёбра, границы полос).
+        """
+        if self.slabs is None:
+            starts = self.get_coords()
+            ends = np.roll(starts, -1, axis=0)
+            min_y = self.get_bbox()[1]
+            count = max(1, int(np.sqrt(len(starts))))
+            height = (self.get_bbox()[3] - min_y) / count or 1.0
+
+            low = np.minimum(starts[:, 1], ends[:, 1])
+            high = np.maximum(starts[:, 1], ends[:, 1])
+            first = np.clip(((low - min_y) // height).astype(int), 0, count - 1)
+            last = np.clip(((high - min_y) // height).astype(int), 0, count - 1)
+
+            # Ребро попадает во все полосы от first до last
+            lengths = last - first + 1
+            edges = np.repeat(np.arange(len(starts)), lengths)
+            offsets = np.arange(len(edges)) - np.repeat(
+                np.cumsum(lengths) - lengths, lengths
+            )
+            slab_ids = np.repeat(first, lengths) + offsets
+            order = np.argsort(slab_ids, kind="stable")
+            bounds = np.searchsorted(slab_ids[order], np.arange(count + 1))
+            self.slabs = (starts, ends, height, edges[order], bounds)
+        return self.slabs
+
+    def contains(self, x, y):
+        """
+        Правило чётности: считаются рёбра с min(y) < y <= max(y), которые
+        луч вправо от точки пересекает не левее неё. Проверяются только
+        рёбра полосы, в которую попала точка.
+        """
+        if len(self) < 3:
+            return False
+        min_x, min_y, max_x, max_y = self.get_bbox()
+        if not (min_x <= x <= max_x and min_y < y <= max_y):
+            return False
+
+        starts, ends, height, edges, bounds = self.get_slabs()
+        slab = min(int((y - min_y) // height), len(bounds) - 2)
+        candidates = edges[bounds[slab] : bounds[slab + 1]]
+        px, py = starts[candidates, 0], starts[candidates, 1]
+        cx, cy = ends[candidates, 0], ends[candidates, 1]
+
+        crossing = (np.minimum(py, cy) < y) & (y <= np.maximum(py, cy))
+        px, py, cx, cy = px[crossing], py[crossing], cx[crossing], cy[crossing]
+        x_intersection = (y - py) * (cx - px) / (cy - py) + px
+        return bool(np.count_nonzero(x <= x_intersection) % 2)
+
+
+class PolygonGrid:
+    """
+    Равномерная сетка над сценой: в ячейке лежат полигоны, чей
+    ограничивающий прямоугольник её задевает. Проверка точки смотрит
+    только полигоны её ячейки. Полигоны, которые заняли бы больше
+    max_cells ячеек, хранятся отдельно и проверяются всегда. Изменённые
+    полигоны переносятся в сетке при следующей проверке.
+    """
+
+    def __init__(self, cell_size=64, max_cells=4096):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.cells = {}
+        self.polygon_cells = {}
+        self.large = []
+        self.stale = set()
+
+    def get_cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add(self, polygon):
+        min_x, min_y, max_x, max_y = polygon.get_bbox()
+        x0, y0 = self.get_cell(min_x, min_y)
+        x1, y1 = self.get_cell(max_x, max_y)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self.max_cells:
+            self.large.append(polygon)
+            self.polygon_cells[polygon] = None
+            return
+
+        keys = [(i, j) for i in range(x0, x1 + 1) for j in range(y0, y1 + 1)]
+        for key in keys:
+            self.cells.setdefault(key, []).append(polygon)
+        self.polygon_cells[polygon] = keys
+
+    def remove(self, polygon):
+        self.stale.discard(polygon)
+        keys = self.polygon_cells.pop(polygon)
+        if keys is None:
+            self.large.remove(polygon)
+            return
+        for key in keys:
+            cell = self.cells[key]
+            cell.remove(polygon)
+            if not cell:
+                del self.cells[key]
+
+    def update(self, polygon):
+        """Отмечает изменённый полигон, если он есть в сетке."""
+        if polygon in self.polygon_cells:
+            self.stale.add(polygon)
+
+    def refresh(self):
+        """Переносит отмеченные полигоны по их новым прямоугольникам."""
+        for polygon in list(self.stale):
+            self.remove(polygon)
+            self.add(polygon)
+
+    def clear(self):
+        self.cells.clear()
+        self.polygon_cells.clear()
+        self.large.clear()
+        self.stale.clear()
+
+    def query(self, x, y):
+        """Полигоны, внутри которых лежит точка (x, y)."""
+        self.refresh()
+        candidates = self.cells.get(self.get_cell(x, y), []) + self.large
+        return [polygon for polygon in candidates if polygon.contains(x, y)]
+
+
+GRID_CELLS_PER_EDGE = 8  # Предел средней доли ячеек на ребро в широкой фазе
+
+
+def get_repeat_offsets(lengths):
+    """Для каждого элемента np.repeat(..., lengths) — его номер внутри повтора."""
+    return np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+
+def get_candidate_pairs(starts, ends):
+    """
+    Широкая фаза: равномерная сетка с ячейкой порядка размера ребра.
+    Ребро регистрируется во всех ячейках своего ограничивающего
+    прямоугольника, пары берутся внутри ячеек. Возвращает пары (i, j),
+    i < j, без повторов и с пересекающимися прямоугольниками.
+    """
+    count = len(starts)
+    low = np.minimum(starts, ends)
+    high = np.maximum(starts, ends)
+    origin = low.min(axis=0)
+    extent = (high.max(axis=0) - origin).max()
+    # Ячейка порядка типичного ребра, но не мельче 2^-20 размера сцены
+    cell = max(np.median((high - low).max(axis=1)), extent / (1 << 20), 1e-9)
+
+    # Длинные рёбра занимают много ячеек: тогда ячейка укрупняется
+    while True:
+        first_cell = ((low - origin) // cell).astype(np.int64)
+        last_cell = ((high - origin) // cell).astype(np.int64)
+        spans = last_cell - first_cell + 1
+        cells_per_edge = spans[:, 0] * spans[:, 1]
+        if cells_per_edge.sum() <= GRID_CELLS_PER_EDGE * count:
+            break
+        cell *= 2
+    edges = np.repeat(np.arange(count), cells_per_edge)
+    offsets = get_repeat_offsets(cells_per_edge)
+    cell_x = first_cell[edges, 0] + offsets % spans[edges, 0]
+    cell_y = first_cell[edges, 1] + offsets // spans[edges, 0]
+    cell_ids = cell_y * (last_cell[:, 0].max() + 1) + cell_x
+
+    order = np.argsort(cell_ids, kind="stable")
+    cell_ids, edges = cell_ids[order], edges[order]
+
+    # Каждая запись ячейки образует пары со всеми следующими в той же ячейке
+    group_bounds = np.flatnonzero(np.diff(cell_ids)) + 1
+    group_starts = np.concatenate([[0], group_bounds])
+    group_ends = np.concatenate([group_bounds, [len(cell_ids)]])
+    entry_ends = np.repeat(group_ends, group_ends - group_starts)
+    partners = entry_ends - np.arange(len(cell_ids)) - 1
+    left = np.repeat(np.arange(len(cell_ids)), partners)
+    right = left + 1 + get_repeat_offsets(partners)
+
+    first = np.minimum(edges[left], edges[right])
+    second = np.maximum(edges[left], edges[right])
+    keys = np.sort(first * count + second)
+    if len(keys):
+        keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+    first, second = keys // count, keys % count
+
+    overlap = np.all(
+        (low[first] <= high[second]) & (low[second] <= high[first]), axis=1
+    )
+    return first[overlap], second[overlap]
+
+
+def intersect_segment_pairs(starts, ends, first, second):
+    """
+    Узкая фаза для массива пар отрезков, те же формулы, что в
+    get_intersection_point: параллельные отрезки не пересекаются.
+    Возвращает пересекающиеся пары и точки пересечения.
+    """
+    p1, p2 = starts[first], ends[first]
+    p3, p4 = starts[second], ends[second]
+    d12, d34, d13 = p1 - p2, p3 - p4, p1 - p3
+    denominator = d12[:, 0] * d34[:, 1] - d12[:, 1] * d34[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (d13[:, 0] * d34[:, 1] - d13[:, 1] * d34[:, 0]) / denominator
+        u = -(d12[:, 0] * d13[:, 1] - d12[:, 1] * d13[:, 0]) / denominator
+    hit = (denominator != 0) & (0 <= t) & (t <= 1) & (0 <= u) & (u <= 1)
+    points = p1[hit] + t[hit, np.newaxis] * (p2[hit] - p1[hit])
+    return first[hit], second[hit], points
+
+
+def find_polygon_intersections(polygons):
+    """
+    Все пересечения рёбер полигонов: между разными полигонами и внутри
+    одного, кроме соседних рёбер. Возвращает список
+    (начало ребра, конец ребра, начало второго, конец второго, точка).
+    """
+    polygons = [polygon for polygon in polygons if len(polygon) >= 3]
+    if not polygons:
+        return []
+    vertices = [polygon.get_coords() for polygon in polygons]
+    starts = np.concatenate(vertices)
+    ends = np.concatenate([np.roll(points, -1, axis=0) for points in vertices])
+    sizes = np.array([len(polygon) for polygon in polygons])
+    owners = np.repeat(np.arange(len(polygons)), sizes)
+    local = get_repeat_offsets(sizes)
+
+    first, second = get_candidate_pairs(starts, ends)
+    step = (local[second] - local[first]) % sizes[owners[first]]
+    adjacent = (owners[first] == owners[second]) & (
+        (step == 1) | (step == sizes[owners[first]] - 1)
+    )
+    first, second, points = intersect_segment_pairs(
+        starts, ends, first[~adjacent], second[~adjacent]
+    )
+
+    vertices = [point for polygon in polygons for point in polygon.points]
+    next_vertices = [
+        polygon.points[(index + 1) % len(polygon)]
+        for polygon in polygons
+        for index in range(len(polygon))
+    ]
+    return [
+        (vertices[i], next_vertices[i], vertices[j], next_vertices[j], (ix, iy))
+        for i, j, (ix, iy) in zip(first.tolist(), second.tolist(), points.tolist())
+    ]
+
+
+CLASSIFY_CHUNK = 1 << 16  # Элементов "точки x рёбра" за проход, чтобы куски были в кэше
+EDGE_POSITIONS = {-1: "Слева", 0: "На линии", 1: "Справа"}
+
+
+def get_points_inside_polygon(points, polygon, order=None):
+    """
+    Принадлежность массива точек (P, 2) полигону, правило как в
+    Polygon.contains. Точки отбираются по ограничивающему прямоугольнику
+    (order — argsort точек по x, если уже посчитан), затем раскладываются
+    по полосам рёбер, и каждая полоса проверяется одним broadcasting.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    inside = np.zeros(len(points), dtype=bool)
+    if len(polygon) < 3 or len(points) == 0:
+        return inside
+    if order is None:
+        order = np.argsort(points[:, 0], kind="stable")
+
+    min_x, min_y, max_x, max_y = polygon.get_bbox()
+    sorted_x = points[order, 0]
+    low = np.searchsorted(sorted_x, min_x, side="left")
+    high = np.searchsorted(sorted_x, max_x, side="right")
+    candidates = order[low:high]
+    y = points[candidates, 1]
+    candidates = candidates[(min_y < y) & (y <= max_y)]
+    if len(candidates) == 0:
+        return inside
+
+    starts, ends, height, edges, bounds = polygon.get_slabs()
+    slabs = np.minimum(
+        ((points[candidates, 1] - min_y) // height).astype(int), len(bounds) - 2
+    )
+    slab_order = np.argsort(slabs, kind="stable")
+    candidates, slabs = candidates[slab_order], slabs[slab_order]
+    slab_bounds = np.searchsorted(slabs, np.arange(len(bounds)))
+
+    for slab in np.flatnonzero(np.diff(slab_bounds)).tolist():
+        slab_edges = edges[bounds[slab] : bounds[slab + 1]]
+        px, py = starts[slab_edges, 0], starts[slab_edges, 1]
+        cx, cy = ends[slab_edges, 0], ends[slab_edges, 1]
+        low_y, high_y = np.minimum(py, cy), np.maximum(py, cy)
+
+        slab_points = candidates[slab_bounds[slab] : slab_bounds[slab + 1]]
+        rows = max(1, CLASSIFY_CHUNK // max(len(slab_edges), 1))
+        for start in range(0, len(slab_points), rows):
+            chunk = slab_points[start : start + rows]
+            qx = points[chunk, 0, np.newaxis]
+            qy = points[chunk, 1, np.newaxis]
+            crossing = (low_y < qy) & (qy <= high_y)
+            # Деление на нулевую высоту ребра даёт inf/nan, такие рёбра
+            # уже отброшены условием по y
+            with np.errstate(divide="ignore", invalid="ignore"):
+                crossing &= qx <= (qy - py) * (cx - px) / (cy - py) + px
+            inside[chunk] = np.count_nonzero(crossing, axis=1) % 2 == 1
+    return inside
+
+
+def get_edge_signs(points, polygon):
+    """
+    Знак положения точек (P, 2) относительно прямых полигона (его
+    последовательных вершин), как в classify_point_position: -1 слева,
+    1 справа, 0 на линии. Возвращает (P, len(polygon) - 1) int8.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    vertices = polygon.get_coords()
+    x1, y1 = vertices[:-1, 0], vertices[:-1, 1]
+    dx, dy = vertices[1:, 0] - x1, vertices[1:, 1] - y1
+    signs = np.empty((len(points), len(dx)), dtype=np.int8)
+
+    # Временные массивы выделяются один раз на все куски точек
+    rows = max(1, min(CLASSIFY_CHUNK // max(len(dx), 1), len(points)))
+    determinant = np.empty((rows, len(dx)))
+    term = np.empty_like(determinant)
+    for start in range(0, len(points), rows):
+        chunk = points[start : start + rows]
+        left, right = determinant[: len(chunk)], term[: len(chunk)]
+        np.subtract(chunk[:, 1, np.newaxis], y1, out=left)
+        left *= dx
+        np.subtract(chunk[:, 0, np.newaxis], x1, out=right)
+        right *= dy
+        left -= right
+        np.sign(left, out=left)
+        signs[start : start + rows] = left
+    return signs
+
+
+def classify_points(points, polygons, with_edges=True):
+    """
+    Пакетная классификация точек (P, 2) относительно полигонов:
+    inside (P, M) — точка внутри полигона, и, если with_edges, список
+    по полигонам массивов знаков get_edge_signs.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    order = np.argsort(points[:, 0], kind="stable")
+    inside = np.zeros((len(points), len(polygons)), dtype=bool)
+    for index, polygon in enumerate(polygons):
+        inside[:, index] = get_points_inside_polygon(points, polygon, order)
+    if not with_edges:
+        return inside, None
+    return inside, [get_edge_signs(points, polygon) for polygon in polygons]
+
+
+def get_pivot_transform(matrix, point):
+    """Преобразование matrix относительно точки point: T(p) @ M @ T(-p)."""
+    px, py = point
+    to_origin = np.array([[1, 0, -px], [0, 1, -py], [0, 0, 1]])
+    back = np.array([[1, 0, px], [0, 1, py], [0, 0, 1]])
+    return back @ matrix @ to_origin
+
+
 class PolygonEditor:
     def __init__(self, root):
         self.root = root
@@ -18,6 +453,10 @@ class PolygonEditor:
         )
         self.status_label.pack(pady=10)
 
+        # Сколько полигонов под курсором, обновляется при движении мыши
+        self.hover_label = tk.Label(control_frame, text="", font=("Arial", 10))
+        self.hover_label.pack()
+
         # Поля для ввода смещения
         self.dx_entry = self.create_labeled_entry(control_frame, "dx:")
         self.dy_entry = self.create_labeled_entry(control_frame, "dy:")
@@ -52,6 +491,11 @@ class PolygonEditor:
         )
         self.scale_btn.pack(fill=tk.X, padx=10, pady=5)
 
+        self.undo_btn = tk.Button(
+            control_frame, text="Отменить преобразование", command=self.undo_transform
+        )
+        self.undo_btn.pack(fill=tk.X, padx=10, pady=5)
+
         self.clear_btn = tk.Button(
             control_frame, text="Очистить сцену", command=self.clear_scene
         )
@@ -69,11 +513,13 @@ class PolygonEditor:
         self.message_window.pack(padx=10, pady=10)
 
         self.polygons = []  # список всех полигонов
-        self.current_polygon = []  # текущий строящийся полигон
+        self.current_polygon = Polygon()  # текущий строящийся полигон
         self.selected_polygon = None  # выбранный полигон для трансформаций
+        self.polygon_grid = PolygonGrid()  # индекс для проверки попадания
 
         self.canvas.bind("<Button-1>", self.add_point)
         self.canvas.bind("<Button-3>", self.check_point)
+        self.canvas.bind("<Motion>", self.hover)
 
     def create_labeled_entry(self, parent, label_text):
         """Функция для создания поля ввода с меткой"""
@@ -114,36 +560,27 @@ class PolygonEditor:
                 self.current_polygon
             )  # временно, как текущий полигон
             self.polygons.append(self.current_polygon)
+            self.polygon_grid.add(self.current_polygon)
+        else:
+            self.polygon_grid.update(self.current_polygon)
 
     def clear_scene(self):
         """Очистка сцены"""
         self.canvas.delete("all")
         self.polygons.clear()
-        self.current_polygon = []
+        self.polygon_grid.clear()
+        self.current_polygon = Polygon()
         self.status_label.config(text="Сцена очищена")
         self.message_window.delete(1.0, tk.END)  # Очистка окна сообщений
 
     def translate(self):
         """Смещение полигона на dx, dy"""
-        print(self.selected_polygon)
         if self.selected_polygon:
             dx = float(self.dx_entry.get() or 0)
             dy = float(self.dy_entry.get() or 0)
-            translation_point = self.get_input_point() or (0, 0)
 
             translation_matrix = np.array([[1, 0, dx], [0, 1, dy], [0, 0, 1]])
-
-            for i, (x, y) in enumerate(self.selected_polygon):
-                point = np.array(
-                    [x - translation_point[0], y - translation_point[1], 1]
-                )
-                new_point = translation_matrix @ point
-                self.selected_polygon[i] = (
-                    new_point[0] + translation_point[0],
-                    new_point[1] + translation_point[1],
-                )
-
-            self.redraw()
+            self.transform_polygon(self.selected_polygon, translation_matrix)
 
     def rotate(self):
         """Поворот полигона на заданный угол"""
@@ -156,18 +593,10 @@ class PolygonEditor:
             rotation_matrix = np.array(
                 [[cos(angle), -sin(angle), 0], [sin(angle), cos(angle), 0], [0, 0, 1]]
             )
-
-            for i, (x, y) in enumerate(self.selected_polygon):
-                translated_point = np.array(
-                    [x - rotation_point[0], y - rotation_point[1], 1]
-                )
-                rotated_point = rotation_matrix @ translated_point
-                self.selected_polygon[i] = (
-                    rotated_point[0] + rotation_point[0],
-                    rotated_point[1] + rotation_point[1],
-                )
-
-            self.redraw()
+            self.transform_polygon(
+                self.selected_polygon,
+                get_pivot_transform(rotation_matrix, rotation_point),
+            )
 
     def scale(self):
         """Масштабирование полигона на заданный коэффициент"""
@@ -180,39 +609,49 @@ class PolygonEditor:
             scaling_matrix = np.array(
                 [[scale_factor, 0, 0], [0, scale_factor, 0], [0, 0, 1]]
             )
+            self.transform_polygon(
+                self.selected_polygon,
+                get_pivot_transform(scaling_matrix, scaling_point),
+            )
 
-            for i, (x, y) in enumerate(self.selected_polygon):
-                translated_point = np.array(
-                    [x - scaling_point[0], y - scaling_point[1], 1]
-                )
-                scaled_point = scaling_matrix @ translated_point
-                self.selected_polygon[i] = (
-                    scaled_point[0] + scaling_point[0],
-                    scaled_point[1] + scaling_point[1],
-                )
+    def transform_polygon(self, polygon, matrix):
+        """Кладёт матрицу в стек полигона, вершины пересчитаются при отрисовке."""
+        polygon.push_transform(matrix)
+        self.polygon_grid.update(polygon)
+        self.redraw()
 
+    def undo_transform(self):
+        """Отмена последнего преобразования выбранного полигона"""
+        if self.selected_polygon and self.selected_polygon.pop_transform():
+            self.polygon_grid.update(self.selected_polygon)
             self.redraw()
+        else:
+            self.message_window.insert(tk.END, "Нет преобразований для отмены\n")
 
     def get_polygon_center(self, polygon):
         """Нахождение центра полигона"""
-        x_coords = [x for x, y in polygon]
-        y_coords = [y for x, y in polygon]
-        return sum(x_coords) / len(x_coords), sum(y_coords) / len(y_coords)
+        return tuple(polygon.get_coords().mean(axis=0).tolist())
 
     def redraw(self):
         """Перерисовка всех полигонов"""
         self.canvas.delete("all")
         for polygon in self.polygons:
             if len(polygon) > 1:
-                self.canvas.create_polygon(polygon, outline="black", fill="", width=2)
+                self.canvas.create_polygon(
+                    polygon.get_coords().ravel().tolist(),
+                    outline="black",
+                    fill="",
+                    width=2,
+                )
 
     def check_point(self, event):
         """Проверка принадлежности точки полигону и классификация"""
         x, y = event.x, event.y
         self.message_window.delete(1.0, tk.END)  # Очистка предыдущих сообщений
 
+        inside = set(self.polygon_grid.query(x, y))
         for polygon in self.polygons:
-            if self.is_point_inside_polygon((x, y), polygon):
+            if polygon in inside:
                 self.message_window.insert(tk.END, "Точка внутри полигона\n")
             else:
                 self.message_window.insert(tk.END, "Точка снаружи полигона\n")
@@ -220,82 +659,39 @@ class PolygonEditor:
             if len(polygon) >= 2:
                 self.classify_point_position((x, y), polygon)
 
-    def is_point_inside_polygon(self, point, polygon):
-        """Проверка принадлежности точки полигону"""
-        x, y = point
-        n = len(polygon)
-        inside = False
-        px, py = polygon[0]
-        for i in range(n + 1):
-            cx, cy = polygon[i % n]
-            if y > min(py, cy):
-                if y <= max(py, cy):
-                    if x <= max(px, cx):
-                        if py != cy:
-                            xinters = (y - py) * (cx - px) / (cy - py) + px
-                        if px == cx or x <= xinters:
-                            inside = not inside
-            px, py = cx, cy
-        return inside
+    def hover(self, event):
+        """Классификация курсора через сетку: проверяются только соседние полигоны."""
+        inside = self.polygon_grid.query(event.x, event.y)
+        self.hover_label.config(text=f"Курсор внутри полигонов: {len(inside)}")
 
     def classify_point_position(self, point, polygon):
         """Классификация положения точки относительно прямых полигона"""
         px, py = point
-        for i in range(len(polygon) - 1):
+        signs = get_edge_signs([point], polygon)[0]
+        for i, sign in enumerate(signs.tolist()):
             x1, y1 = polygon[i]
             x2, y2 = polygon[i + 1]
-            position = self.get_point_position_relative_to_line(px, py, x1, y1, x2, y2)
+            position = EDGE_POSITIONS[sign]
             line_description = f"Точка ({px}, {py}) относительно прямой ({x1}, {y1}) - ({x2}, {y2}): {position}\n"
             self.message_window.insert(tk.END, line_description)
 
-    def get_point_position_relative_to_line(self, px, py, x1, y1, x2, y2):
-        """Определение положения точки относительно прямой"""
-        determinant = (x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
-        if determinant < 0:
-            return "Слева"
-        elif determinant > 0:
-            return "Справа"
-        else:
-            return "На линии"
-
     def check_polygon_intersections(self):
         """Проверка пересечений рёбер полигона"""
         self.redraw()
         self.message_window.delete(1.0, tk.END)  # Очистка предыдущих сообщений
 
-        polygon = self.selected_polygon
-        n = len(polygon)
-        if n < 3:
+        if not any(len(polygon) >= 3 for polygon in self.polygons):
             self.message_window.insert(
                 tk.END, "Полигон не может иметь менее 3 вершин\n"
             )
             return
 
-        for i in range(n):
-            x1, y1 = polygon[i]
-            x2, y2 = polygon[(i + 1) % n]  # Замыкаем ребро с первой точкой
-
-            # Проверяем на пересечение только с не смежными рёбрами
-            for j in range(
-                i + 2, n - 1
-            ):  # Проверка на пересечение со всеми не смежными рёбрами
-                if j % n == i or j % n == (i + 1) % n:  # Избегаем смежных рёбер
-                    continue
-
-                x3, y3 = polygon[j % n]
-                x4, y4 = polygon[(j + 1) % n]
-
-                intersection_point = self.get_intersection_point(
-                    (x1, y1), (x2, y2), (x3, y3), (x4, y4)
-                )
-
-                if intersection_point:
-                    ix, iy = intersection_point
-                    intersection = f"Ребро ({x1}, {y1})-({x2}, {y2}) пересекается с ребром ({x3}, {y3})-({x4}, {y4}) в точке ({ix}, {iy})\n"
-                    self.canvas.create_oval(
-                        ix - 5, iy - 5, ix + 5, iy + 5, fill="green"
-                    )
-                    self.message_window.insert(tk.END, intersection)
+        # Сетка отбирает близкие пары рёбер, точные проверки идут одним массивом
+        for intersection in find_polygon_intersections(self.polygons):
+            (x1, y1), (x2, y2), (x3, y3), (x4, y4), (ix, iy) = intersection
+            intersection = f"Ребро ({x1}, {y1})-({x2}, {y2}) пересекается с ребром ({x3}, {y3})-({x4}, {y4}) в точке ({ix}, {iy})\n"
+            self.canvas.create_oval(ix - 5, iy - 5, ix + 5, iy + 5, fill="green")
+            self.message_window.insert(tk.END, intersection)
 
     def get_intersection_point(self, p1, p2, p3, p4):
         """Нахождение точки пересечения двух отрезков p1p2 и p3p4, если она существует"""
@@ -321,6 +717,7 @@ class PolygonEditor:
         return None
 
 
-root = tk.Tk()
-app = PolygonEditor(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = PolygonEditor(root)
+    root.mainloop()
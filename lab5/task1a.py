@@ -1,7 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from collections import deque
-import random
+from fractions import Fraction
 
 
 default_iterations = 0
@@ -49,11 +48,203 @@ l_systems = [
 ]
 
 
-def generate_l_system(axiom, rules, iterations):
+L_CHUNK = 1 << 16  # Символов в одной порции развёртки
+
+
+def generate_l_system(axiom, rules, iterations, chunk_size=L_CHUNK):
+    """
+    Развёртка L-системы порциями строк, без построения всей строки.
+
+    Символы раскрываются в глубину по явному стеку итераторов правил,
+    поэтому память — O(iterations) плюс одна порция. Нижние уровни, чья
+    развёртка одного символа короче chunk_size, считаются один раз и
+    выдаются целыми кусками.
+    """
+    symbols = set(axiom) | set(rules) | set("".join(rules.values()))
+    expansions = {symbol: symbol for symbol in symbols}
+    cached = 0
+    while cached < iterations:
+        level = {
+            symbol: "".join(expansions[char] for char in rules.get(symbol, symbol))
+            for symbol in symbols
+        }
+        if max(map(len, level.values())) > chunk_size:
+            break
+        expansions = level
+        cached += 1
+
+    pieces, size = [], 0
+    stack = [(iter(axiom), iterations)]
+    while stack:
+        chars, level = stack[-1]
+        for char in chars:
+            if level > cached and char in rules:
+                stack.append((iter(rules[char]), level - 1))
+                break
+            piece = expansions[char]
+            pieces.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(pieces)
+                pieces, size = [], 0
+        else:
+            stack.pop()
+    if pieces:
+        yield "".join(pieces)
+
+
+def count_l_system_symbols(axiom, rules, iterations):
+    """Сколько раз каждый символ встречается в развёртке, без самой развёртки."""
+    symbols = set(axiom) | set(rules) | set("".join(rules.values()))
+    counts = {symbol: {symbol: 1} for symbol in symbols}
     for _ in range(iterations):
-        result = "".join(rules.get(char, char) for char in axiom)
-        axiom = result
-    return axiom
+        level = {}
+        for symbol in symbols:
+            total = {}
+            for char in rules.get(symbol, symbol):
+                for key, value in counts[char].items():
+                    total[key] = total.get(key, 0) + value
+            level[symbol] = total
+        counts = level
+
+    result = {}
+    for char in axiom:
+        for key, value in counts[char].items():
+            result[key] = result.get(key, 0) + value
+    return result
+
+
+def get_direction_table(angle, direction):
+    """
+    Таблица шагов черепахи (period, 2): направление после k поворотов на
+    angle — это строка k % period, где period — число поворотов на
+    полный оборот (для 25° это 72).
+    """
+    turn = (Fraction(str(angle)) / 360).limit_denominator(1 << 16)
+    period = turn.denominator
+    headings = np.radians(direction) + 2 * np.pi * float(turn) * np.arange(period)
+    return np.stack([np.sin(headings), np.cos(headings)], axis=1), period
+
+
+def get_child_ranges(levels, opens, closes, group_levels):
+    """
+    Прямые потомки пары скобок opens[i] .. closes[i] — символы уровня
+    group_levels[i] между ними. После сортировки символов по (уровень,
+    номер) они идут подряд: возвращает порядок и границы этих отрезков.
+    """
+    count = len(levels)
+    # Уровни малы, сортировка uint16 идёт поразрядно
+    sort_levels = levels.astype(np.uint16) if levels.max() < 1 << 16 else levels
+    order = np.argsort(sort_levels, kind="stable")
+    keys = levels[order] * count + order
+    start = np.searchsorted(keys, group_levels * count + opens)
+    end = np.searchsorted(keys, group_levels * count + closes)
+    return order, start, end
+
+
+def get_group_sums(values, ranges):
+    """Суммы values по прямым потомкам каждой группы из get_child_ranges."""
+    order, start, end = ranges
+    totals = np.cumsum(values[order], axis=0)
+    totals = np.concatenate([np.zeros_like(totals[:1]), totals])
+    return totals[end] - totals[start]
+
+
+# Коды символов для черепахи; остальные символы (X, Y) она пропускает
+MOVE, RIGHT, LEFT, OPEN, CLOSE = 1, 2, 3, 4, 5
+SYMBOL_KINDS = np.zeros(256, dtype=np.uint8)
+for symbol, kind in zip("F+-[]", (MOVE, RIGHT, LEFT, OPEN, CLOSE)):
+    SYMBOL_KINDS[ord(symbol)] = kind
+
+
+class Turtle:
+    """
+    Черепаха для порций развёртки. Внутри порции всё считается массивами:
+    поворот ']' заменяется компенсацией, равной минус сумме поворотов и
+    шагов прямых потомков его группы, после чего направление и позиция —
+    это просто cumsum. Точки пишутся в заранее выделенный массив points.
+    """
+
+    def __init__(self, angle, direction, points):
+        self.table, self.period = get_direction_table(angle, direction)
+        self.points = points
+        self.points[0] = 0, 0
+        self.count = 1
+        self.heading = 0
+        self.position = np.zeros(2)
+        self.stack = []
+
+    def feed(self, chunk):
+        kinds = SYMBOL_KINDS[np.frombuffer(chunk.encode("ascii"), dtype=np.uint8)]
+        kinds = kinds[kinds != 0]
+        # Глубина после символа; ']' без пары в порции закрывает скобку из стека
+        depth = np.cumsum((kinds == OPEN).astype(np.int64) - (kinds == CLOSE))
+        previous_min = np.minimum.accumulate(np.concatenate([[0], depth]))[:-1]
+        unmatched = np.flatnonzero((kinds == CLOSE) & (depth < previous_min))
+
+        start = 0
+        for close in unmatched.tolist():
+            self.feed_balanced(kinds[start:close])
+            self.position, self.heading = self.stack.pop()
+            self.add_points(self.position[np.newaxis])
+            start = close + 1
+        self.feed_balanced(kinds[start:])
+
+    def feed_balanced(self, kinds):
+        """Порция без лишних ']': незакрытые '[' уходят в стек."""
+        if len(kinds) == 0:
+            return
+        is_open = kinds == OPEN
+        is_close = kinds == CLOSE
+        is_move = kinds == MOVE
+        turns = (kinds == LEFT).astype(np.int64) - (kinds == RIGHT)
+        steps = np.zeros((len(kinds), 2))
+
+        opens = np.flatnonzero(is_open)
+        closes = np.flatnonzero(is_close)
+        if len(closes):
+            # Уровень символа: для '[' и ']' — уровень потомков их группы
+            levels = np.cumsum(is_open) - np.cumsum(is_close) + is_close
+            open_levels = levels[opens]
+            close_levels = levels[closes]
+
+            # Парная '[' — последняя до ']' с тем же уровнем потомков
+            open_keys = open_levels * len(kinds) + opens
+            order = np.argsort(open_keys)
+            match = order[
+                np.searchsorted(open_keys[order], close_levels * len(kinds) + closes)
+                - 1
+            ]
+            matched = np.zeros(len(opens), dtype=bool)
+            matched[match] = True
+
+            # Скобки не входят в суммы потомков: их уровень выше всех остальных
+            child_levels = np.where(is_open | is_close, levels.max() + 1, levels)
+            ranges = get_child_ranges(
+                child_levels, opens[match], closes, close_levels
+            )
+            turns[closes] = -get_group_sums(turns, ranges)
+        else:
+            matched = np.zeros(len(opens), dtype=bool)
+        headings = self.heading + np.cumsum(turns)
+        headings %= self.period
+
+        steps[is_move] = self.table[headings[is_move]]
+        if len(closes):
+            steps[closes] = -get_group_sums(steps, ranges)
+        positions = np.cumsum(steps, axis=0)
+        positions += self.position
+
+        self.add_points(positions[is_move | is_close])
+        # Копии, чтобы стек не держал массивы прошлых порций
+        for index in opens[~matched].tolist():
+            self.stack.append((positions[index].copy(), headings[index]))
+        self.position, self.heading = positions[-1].copy(), headings[-1]
+
+    def add_points(self, positions):
+        end = self.count + len(positions)
+        self.points[self.count : end] = positions
+        self.count = end
 
 
 def points_l_system(l_system_index):
@@ -68,35 +259,13 @@ def points_l_system(l_system_index):
 
     rules = system["rules"]
 
-    instructions = generate_l_system(axiom, rules, iterations)
-    print(instructions)
-
-    x, y = 0, 0
-    stack = []
-    points = [(x, y)]
-    current_angle = np.radians(direction)
-
-    for char in instructions:
-        if char == "F":
-            # Двигаемся вперед и сохраняем новую точку
-            x_new = x + np.sin(current_angle)
-            y_new = y + np.cos(current_angle)
-            points.append((x_new, y_new))
-            x, y = x_new, y_new  # Обновляем текущую позицию
-        elif char == "+":
-            # Поворачиваем на угол (вправо)
-            current_angle -= np.radians(angle)
-        elif char == "-":
-            # Поворачиваем на угол (влево)
-            current_angle += np.radians(angle)
-        elif char == "[":
-            # Сохраняем текущую позицию и угол
-            stack.append((x, y, current_angle))
-        elif char == "]":
-            # Восстанавливаем сохраненную позицию и угол
-            x, y, current_angle = stack.pop()
-            points.append((x, y))
+    # Точка на каждый шаг F и на каждый возврат ']', плюс начальная
+    counts = count_l_system_symbols(axiom, rules, iterations)
+    points = np.empty((1 + counts.get("F", 0) + counts.get("]", 0), 2))
 
+    turtle = Turtle(angle, direction, points)
+    for chunk in generate_l_system(axiom, rules, iterations):
+        turtle.feed(chunk)
     return points
 
 
@@ -122,4 +291,5 @@ def draw_iter(l_system_index):
         draw_by_points(points=points)
 
 
-draw_iter(l_systems_index)
+if __name__ == "__main__":
+    draw_iter(l_systems_index)
@@ -81,7 +81,8 @@ class Polyhedron3D:
 
     def __init__(self, vertices, edges):
         self.vertices = vertices  # Координаты вершин
-        self.edges = edges  # Пары индексов для рёбер
+        # Пары индексов для рёбер, массив (E, 2)
+        self.edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
 
     def project(self, point, matrix):
         """Проецируем точку через заданную матрицу."""
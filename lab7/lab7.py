@@ -1,4 +1,6 @@
+import os
 import math
+from itertools import chain
 import tkinter as tk
 import numpy as np
 from tkinter import filedialog, messagebox
@@ -10,69 +12,81 @@ from lab6 import (
     get_polyhedron,
     MainWindow,
 )
+from objfile import read_obj, get_unique_edges
 
 
-def load_from_obj(filepath):
+def flatten_polylines(polylines):
+    """Склеивает списки индексов в один массив и возвращает его вместе со смещениями."""
+    sizes = np.fromiter(map(len, polylines), dtype=np.int64, count=len(polylines))
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    indices = np.fromiter(chain.from_iterable(polylines), dtype=np.int64, count=offsets[-1])
+    return indices, offsets
+
+
+def load_from_obj(filepath, use_cache=True):
     """
     Загрузка модели из файла OBJ.
+    Разобранные массивы кэшируются в файле рядом с моделью.
+    """
+    arrays = read_obj(filepath, use_cache)
+
+    # Рёбра из ломаных и граней
+    edges = get_unique_edges(
+        arrays["indices"],
+        arrays["offsets"],
+        arrays["line_indices"],
+        arrays["line_offsets"],
+    )
+    return Polyhedron3D(arrays["vertices"].astype(float), edges)
 
+
+OBJ_WRITE_CHUNK = 1 << 16  # Сколько строк OBJ форматируется за одну запись
+
+
+def write_obj_rows(file, line_format, rows, chunk_rows=OBJ_WRITE_CHUNK):
+    """
+    Записывает строки таблицы rows (n, k) блоками: шаблон строки повторяется
+    на весь блок и заполняется одним оператором %, без цикла по строкам.
     """
-    vertices = []
-    faces = []
-    edges = set()
-
-    with open(filepath, "r") as file:
-        for line in file:
-            parts = line.strip().split()
-            if not parts:
-                continue
-            if parts[0] == "v":  # Вершина
-                vertices.append(list(map(float, parts[1:4])))
-            elif parts[0] == "f":  # Грань
-                face = [int(idx.split("/")[0]) - 1 for idx in parts[1:]]
-                faces.append(face)
-            elif parts[0] == "l":  # Ребро
-                edge = [int(idx) - 1 for idx in parts[1:]]
-                for i in range(len(edge) - 1):
-                    edges.add((edge[i], edge[i + 1]))
-
-    # Если есть грани, извлекаем рёбра из них
-    for face in faces:
-        for i in range(len(face)):
-            edges.add((face[i], face[(i + 1) % len(face)]))
-
-    return Polyhedron3D(vertices, list(edges))
-
-
-def save_to_obj(polyhedron, filepath):
+    rows = np.asarray(rows)
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start : start + chunk_rows]
+        file.write((line_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def get_obj_vertex_rows(vertices):
+    """Вершины (N, 3); у двумерных вершин координата Z дополняется нулём."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if vertices.size == 0:
+        return vertices.reshape(0, 3)
+    if vertices.ndim != 2 or vertices.shape[1] not in (2, 3):
+        raise ValueError(f"Некорректные вершины: массив формы {vertices.shape}")
+    if vertices.shape[1] == 2:
+        vertices = np.column_stack([vertices, np.zeros(len(vertices))])
+    return vertices
+
+
+def save_to_obj(polyhedron, filepath, precision=17):
     """
     Сохранение модели в формате OBJ (только вершины и рёбра).
 
     :param filepath: Путь к файлу для сохранения.
+    :param precision: Число значащих цифр координат (17 - без потерь для float64).
     """
-    with open(filepath, "w") as file:
-        # Записываем вершины
-        for vertex in polyhedron.vertices:
-            # Если вершина не содержит координаты Z, добавляем её как 0.0
-            if len(vertex) == 2:
-                x, y = vertex
-                z = 0.0
-            elif len(vertex) == 3:
-                x, y, z = vertex
-            else:
-                raise ValueError(f"Некорректная вершина: {vertex}")
-
-            file.write(f"v {x} {y} {z}\n")
+    vertices = get_obj_vertex_rows(polyhedron.vertices)
+    edges = np.asarray(polyhedron.edges, dtype=np.int64).reshape(-1, 2)
 
-        # Записываем рёбра
-        for edge in polyhedron.edges:
-            # Убедимся, что рёбра содержат только существующие индексы
-            start, end = edge
-            if start >= len(polyhedron.vertices) or end >= len(polyhedron.vertices):
-                raise ValueError(f"Некорректное ребро: {edge}")
+    # Убедимся, что рёбра содержат только существующие индексы
+    invalid = (edges < 0) | (edges >= len(vertices))
+    if invalid.any():
+        raise ValueError(f"Некорректное ребро: {edges[invalid.any(axis=1)][0]}")
 
-            # Добавляем 1 к индексам для соответствия формату OBJ
-            file.write(f"l {start + 1} {end + 1}\n")
+    number = f" %.{precision}g"
+    with open(filepath, "w", buffering=1 << 20) as file:
+        write_obj_rows(file, "v" + number * 3 + "\n", vertices)
+        # Добавляем 1 к индексам для соответствия формату OBJ
+        write_obj_rows(file, "l %d %d\n", edges + 1)
 
 
 class NewMainWindow(MainWindow):
@@ -302,12 +316,7 @@ class NewMainWindow(MainWindow):
                     )
 
         # Рассчитываем рёбра
-        edges = set()
-        for face in faces:
-            for i in range(len(face)):
-                edges.add((face[i], face[(i + 1) % len(face)]))
-
-        return Polyhedron3D(vertices, list(edges))
+        return Polyhedron3D(vertices, get_unique_edges(*flatten_polylines(faces)))
 
     def generate_surface(self):
         # Чтение параметров
@@ -1,65 +1,130 @@
+import os
+import argparse
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import numpy as np
 from random import choice
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from PIL import Image, ImageTk
+
+from objfile import read_obj, get_unique_edges
+
 
 def random_color():
     """Возвращает случайный цвет в форматеа HEX."""
     colors = ["#FF5733", "#33FF57", "#3357FF", "#F7FF33", "#FF33F7"]
     return choice(colors)
 
-def load_from_obj(filepath):
+
+def hex_to_rgb(color):
+    """Переводит цвет из HEX в кортеж (r, g, b)."""
+    color = color.lstrip("#")
+    return tuple(int(color[i : i + 2], 16) for i in (0, 2, 4))
+
+
+def load_from_obj(filepath, use_cache=True):
     """
     Загрузка модели из файла OBJ с использованием faces.
+    Разобранные массивы кэшируются в файле рядом с моделью.
     """
-    vertices = []
-    faces = []
+    arrays = read_obj(filepath, use_cache)
+    # Рёбра извлекаются из граней сортировкой при первом обращении
+    mesh = Mesh(
+        arrays["vertices"],
+        arrays["indices"],
+        arrays["offsets"],
+        texcoords=arrays["texcoords"],
+        normals=arrays["normals"],
+        texcoord_indices=arrays["texcoord_indices"],
+        normal_indices=arrays["normal_indices"],
+    )
+    return Polyhedron3D.from_mesh(mesh)
 
-    with open(filepath, "r") as file:
-        for line in file:
-            parts = line.strip().split()
-            if not parts:
-                continue
-            if parts[0] == "v":  # Вершина
-                vertices.append(list(map(float, parts[1:4])))
-            elif parts[0] == "f":  # Грань
-                # Обработка грани, где индексы вершин могут содержать дополнительные данные
-                face = [int(idx.split("/")[0]) - 1 for idx in parts[1:]]
-                print(face)
-                faces.append(face)
 
-    # Извлекаем рёбра из граней
-    edges = set()
-    for face in faces:
-        for i in range(len(face)):
-            edges.add((face[i], face[(i + 1) % len(face)]))
+OBJ_WRITE_CHUNK = 1 << 16  # Сколько строк OBJ форматируется за одну запись
 
-    return Polyhedron3D(vertices, list(edges), faces)
 
+def write_obj_rows(file, line_format, rows, chunk_rows=OBJ_WRITE_CHUNK):
+    """
+    Записывает строки таблицы rows (n, k) блоками: шаблон строки повторяется
+    на весь блок и заполняется одним оператором %, без цикла по строкам.
+    """
+    rows = np.asarray(rows)
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start : start + chunk_rows]
+        file.write((line_format * len(chunk)) % tuple(chunk.ravel().tolist()))
 
-def save_to_obj(polyhedron, filepath):
+
+def get_obj_vertex_rows(vertices):
+    """Вершины (N, 3); у двумерных вершин координата Z дополняется нулём."""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if vertices.size == 0:
+        return vertices.reshape(0, 3)
+    if vertices.ndim != 2 or vertices.shape[1] not in (2, 3):
+        raise ValueError(f"Некорректные вершины: массив формы {vertices.shape}")
+    if vertices.shape[1] == 2:
+        vertices = np.column_stack([vertices, np.zeros(len(vertices))])
+    return vertices
+
+
+def save_to_obj(polyhedron, filepath, precision=17):
     """
     Сохранение модели в формате OBJ с использованием faces.
+    Если у сетки есть текстурные координаты или нормали, они тоже
+    записываются (vt, vn и грани вида a/b/c).
     :param polyhedron: Экземпляр Polyhedron3D для сохранения.
     :param filepath: Путь к файлу для сохранения.
+    :param precision: Число значащих цифр координат (17 - без потерь для float64).
     """
-    with open(filepath, "w") as file:
-        # Записываем вершины
-        for vertex in polyhedron.vertices:
-            if len(vertex) == 2:  # Если координаты только X и Y
-                x, y = vertex
-                z = 0.0
-            elif len(vertex) == 3:  # Координаты X, Y, Z
-                x, y, z = vertex
-            else:
-                raise ValueError(f"Некорректная вершина: {vertex}")
-
-            file.write(f"v {x} {y} {z}\n")
+    mesh = polyhedron.mesh
+    number = f" %.{precision}g"
+
+    # Атрибуты записываются, только если заданы для каждого угла каждой грани
+    def has_attribute(values, indices):
+        return (
+            values is not None
+            and len(values) > 0
+            and indices is not None
+            and len(indices) == len(mesh.indices)
+            and np.all(indices >= 0)
+        )
 
-        # Записываем грани
-        for face in polyhedron.faces:
-            face_str = " ".join(str(idx + 1) for idx in face)  # OBJ формат использует индексацию с 1
-            file.write(f"f {face_str}\n")
+    columns = [mesh.indices]
+    corner_format = "%d"
+    with_texcoords = has_attribute(mesh.texcoords, mesh.texcoord_indices)
+    with_normals = has_attribute(mesh.normals, mesh.normal_indices)
+    if with_texcoords:
+        columns.append(mesh.texcoord_indices)
+        corner_format += "/%d"
+    if with_normals:
+        columns.append(mesh.normal_indices)
+        corner_format += "//%d" if not with_texcoords else "/%d"
+    # OBJ формат использует индексацию с 1
+    corners = np.stack(columns, axis=1).astype(np.int64) + 1
+
+    with open(filepath, "w", buffering=1 << 20) as file:
+        write_obj_rows(file, "v" + number * 3 + "\n", get_obj_vertex_rows(mesh.vertices))
+        if with_texcoords:
+            write_obj_rows(file, "vt" + number * 2 + "\n", mesh.texcoords)
+        if with_normals:
+            write_obj_rows(file, "vn" + number * 3 + "\n", mesh.normals)
+
+        # Грани пишутся сериями одинакового размера (треугольники, квадраты ...)
+        sizes = mesh.face_sizes
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(sizes)) + 1))
+        run_ends = np.append(run_starts[1:], len(sizes))
+        for first, last in zip(run_starts.tolist(), run_ends.tolist()):
+            size = int(sizes[first]) if last > first else 0
+            if size == 0:
+                continue
+            rows = corners[mesh.offsets[first] : mesh.offsets[last]]
+            write_obj_rows(
+                file,
+                "f" + (" " + corner_format) * size + "\n",
+                rows.reshape(last - first, -1),
+            )
 
 
 class Sphere:
@@ -157,15 +222,187 @@ class Camera:
         )
 
 
+class Mesh:
+    """
+    Компактная сетка в формате CSR.
+
+    vertices - координаты вершин float64 (N, 3), indices - плоский буфер
+    индексов всех граней int32, offsets - начало каждой грани в indices
+    int32 (F + 1). Грани могут иметь разное число вершин.
+
+    Необязательные texcoords (T, 2) и normals (M, 3) хранят vt и vn из OBJ,
+    а texcoord_indices и normal_indices идут параллельно indices (-1 - нет).
+    """
+
+    def __init__(
+        self,
+        vertices,
+        indices,
+        offsets,
+        edges=None,
+        texcoords=None,
+        normals=None,
+        texcoord_indices=None,
+        normal_indices=None,
+    ):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 3)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int32)
+        self.edges = edges
+        self.texcoords = texcoords
+        self.normals = normals
+        self.texcoord_indices = texcoord_indices
+        self.normal_indices = normal_indices
+        self._face_table = None
+
+    @classmethod
+    def from_faces(cls, vertices, faces, edges=None):
+        """Собирает сетку из списка граней (списков индексов)."""
+        sizes = np.fromiter((len(face) for face in faces), dtype=np.int32, count=len(faces))
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int32)
+        np.cumsum(sizes, out=offsets[1:])
+        indices = np.fromiter(
+            chain.from_iterable(faces), dtype=np.int32, count=offsets[-1]
+        )
+        return cls(vertices, indices, offsets, edges)
+
+    @property
+    def edges(self):
+        """Рёбра (E, 2) int32; если не заданы явно, выводятся из граней."""
+        if self._edges is None:
+            self._edges = self.get_unique_edges()
+        return self._edges
+
+    @edges.setter
+    def edges(self, value):
+        self._edges = (
+            None if value is None else np.asarray(value, dtype=np.int32).reshape(-1, 2)
+        )
+
+    @property
+    def face_count(self):
+        return len(self.offsets) - 1
+
+    @property
+    def face_sizes(self):
+        return np.diff(self.offsets)
+
+    def get_faces(self):
+        """Грани в виде списка массивов индексов."""
+        return np.split(self.indices, self.offsets[1:-1])
+
+    def get_unique_edges(self):
+        """Уникальные рёбра всех граней, найденные сортировкой."""
+        return get_unique_edges(self.indices, self.offsets)
+
+    def get_face_table(self):
+        """
+        Таблица граней: массив индексов (F, K), дополненный -1 до длины
+        самой большой грани, и количество вершин в каждой грани.
+        """
+        if self._face_table is None:
+            sizes = self.face_sizes
+            width = max(3, sizes.max()) if len(sizes) else 3
+            table = np.full((len(sizes), width), -1, dtype=np.int32)
+            rows = np.repeat(np.arange(len(sizes)), sizes)
+            columns = np.arange(len(self.indices)) - np.repeat(self.offsets[:-1], sizes)
+            table[rows, columns] = self.indices
+            self._face_table = (table, sizes)
+        return self._face_table
+
+
 class Polyhedron3D:
     """Класс для многогранника."""
 
     def __init__(self, vertices, edges,faces):
-        self.vertices = np.array(vertices)  # Координаты вершин
-        self.edges = edges  # Пары индексов для рёбер
-        self.faces = faces
+        self.mesh = Mesh.from_faces(vertices, faces, edges)
         self.color = random_color()
 
+    @classmethod
+    def from_mesh(cls, mesh):
+        """Создаёт многогранник поверх готовой сетки без копирования массивов."""
+        polyhedron = cls.__new__(cls)
+        polyhedron.mesh = mesh
+        polyhedron.color = random_color()
+        return polyhedron
+
+    @property
+    def mesh(self):
+        return self._mesh
+
+    @mesh.setter
+    def mesh(self, value):
+        self._mesh = value
+        self._face_normals = None
+        self._face_centers = None
+
+    @property
+    def vertices(self):
+        return self.mesh.vertices
+
+    @vertices.setter
+    def vertices(self, value):
+        """
+        Любое изменение вершин (translate, rotate, scale, reflect) идёт
+        через присваивание, поэтому здесь же сбрасываем кэш граней.
+        Вершины модели хранятся в float64: преобразования записываются
+        обратно в них, и ошибка округления float32 копилась бы с каждым шагом.
+        """
+        self.mesh.vertices = np.asarray(value, dtype=np.float64)
+        self._face_normals = None
+        self._face_centers = None
+
+    @property
+    def edges(self):
+        return self.mesh.edges
+
+    @property
+    def faces(self):
+        return self.mesh.get_faces()
+
+    @faces.setter
+    def faces(self, value):
+        self.mesh = Mesh.from_faces(self.vertices, value)
+
+    def get_face_table(self):
+        return self.mesh.get_face_table()
+
+    def get_face_normals(self):
+        """Нормали всех граней (по первым трём вершинам), пересчёт только после изменения вершин."""
+        if self._face_normals is None:
+            first = self.mesh.offsets[:-1]
+            last = max(len(self.mesh.indices) - 1, 0)
+            v0, v1, v2 = (
+                self.vertices[self.mesh.indices[np.minimum(first + k, last)]]
+                for k in range(3)
+            )
+            normals = np.cross(v1 - v0, v2 - v0)
+            lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+            self._face_normals = np.divide(
+                normals, lengths, out=np.zeros_like(normals), where=lengths != 0
+            )
+        return self._face_normals
+
+    def get_face_centers(self):
+        """Центры всех граней, пересчёт только после изменения вершин."""
+        if self._face_centers is None:
+            sizes = self.mesh.face_sizes
+            centers = np.zeros((len(sizes), 3))
+            filled = sizes > 0
+            if filled.any():
+                sums = np.add.reduceat(
+                    self.vertices[self.mesh.indices], self.mesh.offsets[:-1][filled]
+                )
+                centers[filled] = sums / sizes[filled, None]
+            self._face_centers = centers
+        return self._face_centers
+
+    def get_visible_faces(self, camera_position):
+        """Маска видимых граней: одно скалярное произведение на все грани."""
+        view_vectors = camera_position - self.get_face_centers()
+        dots = np.einsum("ij,ij->i", self.get_face_normals(), view_vectors)
+        return (dots < 0) & (self.mesh.face_sizes >= 3)
+
     def project(self, point, matrix):
         """Проецируем точку через заданную матрицу."""
         x, y, z = point
@@ -173,6 +410,21 @@ class Polyhedron3D:
         projected = np.dot(matrix, point_4d)
         return projected[0] / projected[3], projected[1] / projected[3]
 
+    def project_vertices(self, matrix):
+        """
+        Проецирует сразу все вершины одним умножением матриц.
+
+        Возвращает нормализованные координаты (N, 3) и маску вершин
+        с ненулевой однородной координатой w.
+        """
+        points_4d = np.c_[self.vertices, np.ones(len(self.vertices))]
+        projected = points_4d @ np.asarray(matrix).T
+        w = projected[:, 3]
+        valid = w != 0
+        normalized = np.zeros((len(projected), 3))
+        normalized[valid] = projected[valid, :3] / w[valid, None]
+        return normalized, valid
+
     def calculate_normal(self, face):
         v1 = self.vertices[face[1]] - self.vertices[face[0]]
         v2 = self.vertices[face[2]] - self.vertices[face[0]]
@@ -567,124 +819,525 @@ def get_progection_matrix(projection_type):
 
 
 class PolyhedronDrawer:
-    """Класс для рисования многогранника с использованием Z-буфера."""
+    """
+    Класс для рисования многогранника с использованием Z-буфера.
+
+    Отрисовщик живёт всё время работы окна: буферы, изображение на холсте
+    и преобразованные вершины переиспользуются между кадрами. Интерфейс
+    лишь сообщает, что изменилось (invalidate_view, invalidate_polyhedron),
+    а перерисовка выполняется один раз, когда Tk освободится.
+
+    Без холста (canvas=None) отрисовщик работает вне экрана: render()
+    возвращает кадровый буфер, и Tk для этого не нужен.
 
-    def __init__(self, canvas, projection_matrix, view_matrix, camera, objects=None):
+    При workers > 1 кадр делится на плитки tile_size x tile_size, грани
+    раскладываются по плиткам, и плитки растеризуются в пуле процессов.
+    Кадровый и Z-буфер тогда лежат в разделяемой памяти: процессы пишут
+    каждый в свои плитки, собирать результат не нужно. После работы
+    такой отрисовщик нужно закрыть методом close().
+    """
+
+    def __init__(
+        self,
+        canvas,
+        projection_matrix,
+        view_matrix,
+        camera,
+        objects=None,
+        width=400,
+        height=400,
+        workers=1,
+        tile_size=128,
+    ):
         self.canvas = canvas
         self.camera = camera
         self.projection_matrix = projection_matrix
         self.view_matrix = view_matrix
-        self.center_x = 200
-        self.center_y = 200
-        self.canvas_width = 400  # Ширина холста
-        self.canvas_height = 400  # Высота холста
-        self.frame_buffer = np.full((400, 400, 3), (255, 255, 255), dtype=np.uint8)  # Белый фон
-        self.z_buffer = np.full((self.canvas_width, self.canvas_height), np.inf)
+        self.center_x = width / 2
+        self.center_y = height / 2
+        self.scale = min(width, height) / 4  # Пикселей на единицу NDC
+        self.canvas_width = width  # Ширина холста
+        self.canvas_height = height  # Высота холста
+        self.frame_buffer = np.full((height, width, 3), (255, 255, 255), dtype=np.uint8)  # Белый фон
+        self.z_buffer = np.full((self.canvas_height, self.canvas_width), np.inf)
+        self.faces_per_batch = 4096  # Сколько граней растеризуется за один проход
+        self.image = None  # Ссылка на PhotoImage, чтобы его не удалил сборщик мусора
+        self.image_item = None  # Элемент холста, в который выводится кадр
         self.objects = []
         if objects != None:
             self.objects = objects
 
+        self.projection_view_matrix = None  # None - матрицу нужно пересчитать
+        self.prepared_faces = {}  # Грани объектов в экранных координатах
+        self.pending_draw = None  # Идентификатор запланированной перерисовки
+
+        self.workers = workers
+        self.tile_size = tile_size
+        self.executor = None  # Пул процессов создаётся при первом кадре
+        self.shared_buffers = []
+        if workers > 1:
+            self.frame_buffer = self._share_array(self.frame_buffer)
+            self.z_buffer = self._share_array(self.z_buffer)
+
+    def _share_array(self, array):
+        """Переносит массив в разделяемую память и возвращает его новую копию."""
+        memory = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        self.shared_buffers.append(memory)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+        shared[:] = array
+        return shared
+
+    def close(self):
+        """Останавливает пул процессов и освобождает разделяемую память."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.shared_buffers:
+            # Буферы остаются доступны как обычные массивы
+            self.frame_buffer = self.frame_buffer.copy()
+            self.z_buffer = self.z_buffer.copy()
+            for memory in self.shared_buffers:
+                memory.close()
+                memory.unlink()
+            self.shared_buffers = []
+        self.workers = 1
+
     def add_polyhedron(self, polyhedron):
-        """Добавляет многогранник в список."""
-        self.objects.append(polyhedron)
+        """Добавляет многогранник (или готовую сетку Mesh) в список."""
+        if isinstance(polyhedron, Mesh):
+            polyhedron = Polyhedron3D.from_mesh(polyhedron)
+        if all(polyhedron is not obj for obj in self.objects):
+            self.objects.append(polyhedron)
+        self.invalidate_polyhedron(polyhedron)
+
+    def clear(self):
+        """Убирает все объекты со сцены."""
+        self.objects.clear()
+        self.prepared_faces.clear()
+        self.request_draw()
+
+    def set_projection_matrix(self, projection_matrix):
+        self.projection_matrix = projection_matrix
+        self.invalidate_view()
+
+    def invalidate_view(self):
+        """Камера или проекция изменились: пересчитать все объекты."""
+        self.projection_view_matrix = None
+        self.prepared_faces.clear()
+        self.request_draw()
+
+    def invalidate_polyhedron(self, polyhedron):
+        """Вершины объекта изменились: пересчитать только его."""
+        self.prepared_faces.pop(polyhedron, None)
+        self.request_draw()
+
+    def request_draw(self):
+        """Планирует перерисовку; несколько запросов подряд дают один кадр."""
+        if self.canvas is None:
+            return  # Вне экрана кадр строится явным вызовом render()
+        if self.pending_draw is None:
+            self.pending_draw = self.canvas.after_idle(self._draw_pending)
+
+    def _draw_pending(self):
+        self.pending_draw = None
+        self.draw()
 
     def draw(self):
-        """Отрисовка многогранников с использованием Z-буфера."""
-        self.canvas.delete("all")
+        """Отрисовка многогранников с использованием Z-буфера на холсте."""
+        self.render()
+        self._blit()
+
+    def render(self):
+        """Строит кадр в буферах и возвращает кадровый буфер (height, width, 3)."""
+        self.frame_buffer[:] = 255  # Белый фон
         self.z_buffer.fill(np.inf)  # Сброс Z-буфера
 
-        # Предварительный расчет матрицы проекции + вида
-        projection_view_matrix = self.projection_matrix @ self.view_matrix
-        camera_position = self.camera.position
+        # Матрица проекции + вида пересчитывается только после движения камеры
+        if self.projection_view_matrix is None:
+            self.view_matrix = self.camera.get_view_matrix()
+            self.projection_view_matrix = self.projection_matrix @ self.view_matrix
 
+        items = []
         for polyhedron in self.objects:
-            for face in polyhedron.faces:
-                # Проверяем видимость грани
-                if not polyhedron.is_face_visible(face, camera_position):
-                    continue
-
-                projected_points = []
-                z_values = []
-
-                for idx in face:
-                    # Берем координаты вершины
-                    x, y, z = polyhedron.vertices[idx]
-                    point_4d = np.array([x, y, z, 1])  # 4D точка
-
-                    # Применяем матрицу преобразования
-                    projected = np.dot(projection_view_matrix, point_4d)
-
-                    if projected[3] != 0:  # Нормализация координат
-                        x_proj = projected[0] / projected[3]
-                        y_proj = projected[1] / projected[3]
-                        z_proj = projected[2] / projected[3]
-                    else:
-                        continue  # Пропускаем точки за пределами видимости
-
-                    # Перевод в экранные координаты
-                    screen_x = int(self.center_x + x_proj * 100)
-                    screen_y = int(self.center_y - y_proj * 100)
-
-                    projected_points.append((screen_x, screen_y))
-                    z_values.append(z_proj)
-
-                # Закрашивание грани
-                self._fill_face_with_zbuffer(projected_points, z_values,polyhedron.color)
-
-    def _fill_face_with_zbuffer(self, points, z_values,color):
-        """Закрашивает грань с использованием Z-буфера."""
-        # Преобразуем список точек в массив numpy
-        points = np.array(points)
-        z_values = np.array(z_values)
-
-        # Находим минимальные и максимальные координаты
-        min_x = max(0, int(np.min(points[:, 0])))
-        max_x = min(self.canvas.winfo_width(), int(np.max(points[:, 0])))
-        min_y = max(0, int(np.min(points[:, 1])))
-        max_y = min(self.canvas.winfo_height(), int(np.max(points[:, 1])))
-
-        # Используем алгоритм сканирующего преобразования
-        for y in range(min_y, max_y + 1):
-            intersections = []
-            z_intersections = []
-
-            for i in range(len(points)):
-                p1 = points[i]
-                p2 = points[(i + 1) % len(points)]
-                z1 = z_values[i]
-                z2 = z_values[(i + 1) % len(points)]
-
-                # Проверяем пересечение с текущей строкой (y)
-                if (p1[1] <= y < p2[1]) or (p2[1] <= y < p1[1]):
-                    t = (y - p1[1]) / (p2[1] - p1[1])
-                    x_intersection = p1[0] + t * (p2[0] - p1[0])
-                    z_intersection = z1 + t * (z2 - z1)
-                    intersections.append(int(x_intersection))
-                    z_intersections.append(z_intersection)
-
-            # Сортируем пересечения по x
-            sorted_indices = np.argsort(intersections)
-            intersections = np.array(intersections)[sorted_indices]
-            z_intersections = np.array(z_intersections)[sorted_indices]
-
-            # Закрашиваем пиксели между парами пересечений
-            for i in range(0, len(intersections) - 1, 2):
-                start_x = intersections[i]
-                end_x = intersections[i + 1]
-                z_start = z_intersections[i]
-                z_end = z_intersections[i + 1]
-
-                # Интерполируем Z вдоль линии
-                z_current = z_start
-                z_step = (z_end - z_start) / (end_x - start_x) if end_x != start_x else 0
-
-                for x in range(start_x, end_x + 1):
-                    if 0 <= x < self.z_buffer.shape[1] and 0 <= y < self.z_buffer.shape[0]:
-                        if z_current < self.z_buffer[y, x]:
-                            self.z_buffer[y, x] = z_current
-                            self.canvas.create_oval(x, y, x + 1, y + 1, fill=color, outline=color)
-
-                    z_current += z_step
+            prepared = self.prepared_faces.get(polyhedron)
+            if prepared is None:
+                prepared = self._prepare_faces(polyhedron)
+                self.prepared_faces[polyhedron] = prepared
+            items.append((*prepared, hex_to_rgb(polyhedron.color)))
+
+        # Закрашивание граней
+        if self.workers > 1:
+            self._render_tiles(items)
+        else:
+            for item in items:
+                self._fill_faces_with_zbuffer(*item)
+
+        return self.frame_buffer
+
+    def _render_tiles(self, items):
+        """Раскладывает грани по плиткам и растеризует плитки в пуле процессов."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        height, width = self.z_buffer.shape
+        tiles_x = -(-width // self.tile_size)
+        tiles_y = -(-height // self.tile_size)
+
+        # Для каждой плитки - список (объект, индексы его граней)
+        tile_faces = [[] for _ in range(tiles_x * tiles_y)]
+        for item_index, (points, _, sizes, _) in enumerate(items):
+            tiles, faces = self._bin_faces(points, sizes, tiles_x, tiles_y)
+            bounds = np.searchsorted(tiles, np.arange(len(tile_faces) + 1))
+            for tile in np.flatnonzero(np.diff(bounds)):
+                tile_faces[tile].append(
+                    (item_index, faces[bounds[tile] : bounds[tile + 1]])
+                )
+
+        names = (self.shared_buffers[0].name, self.shared_buffers[1].name)
+        futures = []
+        for tile, selections in enumerate(tile_faces):
+            if not selections:
+                continue
+            x0 = tile % tiles_x * self.tile_size
+            y0 = tile // tiles_x * self.tile_size
+            clip = (x0, y0, min(x0 + self.tile_size, width), min(y0 + self.tile_size, height))
+            tile_items = []
+            for index, faces in selections:
+                points, z_values, sizes, color = items[index]
+                tile_items.append((points[faces], z_values[faces], sizes[faces], color))
+            futures.append(
+                self.executor.submit(
+                    _rasterize_tile,
+                    names,
+                    (height, width),
+                    clip,
+                    tile_items,
+                    self.faces_per_batch,
+                )
+            )
+        for future in futures:
+            future.result()  # Пробрасываем ошибки из процессов
+
+    def _bin_faces(self, points, sizes, tiles_x, tiles_y):
+        """
+        Раскладка граней по плиткам по их ограничивающим прямоугольникам.
+        Возвращает номера плиток и номера граней, отсортированные по плиткам;
+        внутри плитки грани идут в исходном порядке.
+        """
+        height, width = self.z_buffer.shape
+        in_face = np.arange(points.shape[1]) < sizes[:, None]
+        x, y = points[:, :, 0], points[:, :, 1]
+        big = np.iinfo(np.int64).max
+        min_x = np.min(np.where(in_face, x, big), axis=1)
+        max_x = np.max(np.where(in_face, x, -big), axis=1)
+        min_y = np.min(np.where(in_face, y, big), axis=1)
+        max_y = np.max(np.where(in_face, y, -big), axis=1)
+        on_screen = (sizes >= 3) & (max_x >= 0) & (min_x < width)
+        on_screen &= (max_y >= 0) & (min_y < height)
+
+        faces = np.flatnonzero(on_screen)
+        tile_x0 = np.clip(min_x[faces] // self.tile_size, 0, tiles_x - 1)
+        tile_x1 = np.clip(max_x[faces] // self.tile_size, 0, tiles_x - 1)
+        tile_y0 = np.clip(min_y[faces] // self.tile_size, 0, tiles_y - 1)
+        tile_y1 = np.clip(max_y[faces] // self.tile_size, 0, tiles_y - 1)
+        span_x = tile_x1 - tile_x0 + 1
+        counts = span_x * (tile_y1 - tile_y0 + 1)
+
+        # Грань, накрывающая несколько плиток, повторяется для каждой из них
+        copy = np.repeat(np.arange(len(faces)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        tiles = (tile_y0[copy] + local // span_x[copy]) * tiles_x + (
+            tile_x0[copy] + local % span_x[copy]
+        )
+        order = np.argsort(tiles, kind="stable")
+        return tiles[order], faces[copy[order]]
+
+    def _prepare_faces(self, polyhedron):
+        """
+        Видимые грани объекта в экранных координатах: точки (F, K, 2),
+        глубины (F, K) и число вершин каждой грани.
+        """
+        screen_points, z_values, valid = self._transform_vertices(
+            polyhedron, self.projection_view_matrix
+        )
+
+        table, sizes = polyhedron.get_face_table()
+
+        # Проверяем видимость сразу всех граней
+        visible = polyhedron.get_visible_faces(self.camera.position)
+        table, sizes = table[visible], sizes[visible]
+
+        # Пропускаем точки за пределами видимости: сдвигаем валидные
+        # вершины каждой грани в начало строки таблицы
+        in_face = np.arange(table.shape[1]) < sizes[:, None]
+        keep = in_face & valid[table]
+        order = np.argsort(~keep, axis=1, kind="stable")
+        table = np.take_along_axis(table, order, axis=1)
+        sizes = keep.sum(axis=1)
+
+        return screen_points[table], z_values[table], sizes
+
+    def _transform_vertices(self, polyhedron, projection_view_matrix):
+        """
+        Переводит все вершины многогранника в экранные координаты за один проход.
+
+        Общие вершины граней преобразуются один раз, грани затем лишь
+        индексируют полученные массивы.
+        """
+        normalized, valid = polyhedron.project_vertices(projection_view_matrix)
+
+        # Перевод в экранные координаты
+        screen_points = np.empty((len(normalized), 2), dtype=np.int64)
+        screen_points[:, 0] = np.trunc(self.center_x + normalized[:, 0] * self.scale)
+        screen_points[:, 1] = np.trunc(self.center_y - normalized[:, 1] * self.scale)
+        return screen_points, normalized[:, 2], valid
+
+    def _blit(self):
+        """
+        Выводит кадровый буфер на холст. Изображение и элемент холста
+        создаются один раз, дальше в них лишь копируются пиксели.
+        """
+        frame = Image.fromarray(self.frame_buffer)
+        if self.image is None:
+            self.image = ImageTk.PhotoImage(frame)
+            self.image_item = self.canvas.create_image(
+                0, 0, anchor=tk.NW, image=self.image
+            )
+        else:
+            self.image.paste(frame)
+
+    def _fill_faces_with_zbuffer(self, points, z_values, sizes, color):
+        """Закрашивает грани в буферах отрисовщика (см. fill_faces_with_zbuffer)."""
+        fill_faces_with_zbuffer(
+            self.frame_buffer,
+            self.z_buffer,
+            points,
+            z_values,
+            sizes,
+            color,
+            faces_per_batch=self.faces_per_batch,
+        )
+
+
+def fill_faces_with_zbuffer(
+    frame_buffer, z_buffer, points, z_values, sizes, color, clip=None, faces_per_batch=4096
+):
+    """
+    Закрашивает грани с использованием Z-буфера.
+
+    points - экранные вершины граней (F, K, 2), z_values - их глубины (F, K),
+    sizes - число вершин в каждой грани (остаток строки не используется).
+    Пересечения строк с рёбрами считаются сразу для всех граней, отрезки
+    между парами пересечений (правило чёт-нечёт) разворачиваются в пиксели,
+    и тест глубины выполняется одной векторной операцией. Грани
+    обрабатываются порциями по faces_per_batch, порядок граней сохраняется.
+
+    clip - прямоугольник (x0, y0, x1, y1) без правой и нижней границы;
+    пиксели вне него не трогаются. По умолчанию - весь буфер.
+    """
+    if clip is None:
+        clip = (0, 0, z_buffer.shape[1], z_buffer.shape[0])
+    for start in range(0, len(sizes), faces_per_batch):
+        batch = slice(start, start + faces_per_batch)
+        _fill_faces_batch(
+            frame_buffer, z_buffer, points[batch], z_values[batch], sizes[batch], color, clip
+        )
+
+
+def _fill_faces_batch(frame_buffer, z_buffer, points, z_values, sizes, color, clip):
+    height, width = z_buffer.shape
+    clip_x0, clip_y0, clip_x1, clip_y1 = clip
+    points = points.astype(np.float64)
+    z_values = z_values.astype(np.float64)
+    corners = np.arange(points.shape[1])
+    in_face = corners < sizes[:, None]
+    in_face &= (sizes >= 3)[:, None]
+
+    # Диапазон строк каждой грани
+    face_y = points[:, :, 1]
+    min_y = np.maximum(clip_y0, np.min(np.where(in_face, face_y, np.inf), axis=1))
+    max_y = np.minimum(
+        clip_y1 - 1, np.max(np.where(in_face, face_y, -np.inf), axis=1)
+    )
+    rows = np.where(in_face.any(axis=1), max_y - min_y + 1, 0)
+    rows = np.maximum(rows, 0).astype(np.int64)
+    total_rows = rows.sum()
+    if total_rows == 0:
+        return
+
+    row_face = np.repeat(np.arange(len(rows)), rows)
+    ys = min_y.astype(np.int64)[row_face] + (
+        np.arange(total_rows) - np.repeat(np.cumsum(rows) - rows, rows)
+    )
+
+    # Рёбра граней: вершина k -> следующая вершина той же грани
+    next_corner = np.where(corners + 1 < sizes[:, None], corners + 1, 0)
+    x1, y1 = points[:, :, 0], face_y
+    x2 = np.take_along_axis(x1, next_corner, axis=1)
+    y2 = np.take_along_axis(y1, next_corner, axis=1)
+    z1 = z_values
+    z2 = np.take_along_axis(z1, next_corner, axis=1)
+    x1, y1, x2, y2 = x1[row_face], y1[row_face], x2[row_face], y2[row_face]
+    z1, z2 = z1[row_face], z2[row_face]
+
+    # Пересечения каждой строки со всеми рёбрами её грани
+    row_y = ys[:, None]
+    crosses = in_face[row_face] & (
+        ((y1 <= row_y) & (row_y < y2)) | ((y2 <= row_y) & (row_y < y1))
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (row_y - y1) / (y2 - y1)
+        x_intersections = np.trunc(x1 + t * (x2 - x1))
+        z_intersections = z1 + t * (z2 - z1)
+    x_intersections = np.where(crosses, x_intersections, np.inf)
+
+    # Сортируем пересечения по x в каждой строке
+    order = np.argsort(x_intersections, axis=1)
+    x_intersections = np.take_along_axis(x_intersections, order, axis=1)
+    z_intersections = np.take_along_axis(z_intersections, order, axis=1)
+
+    # Собираем отрезки между парами пересечений
+    span_face, span_y, span_x1, span_x2, span_z1, span_z2 = [], [], [], [], [], []
+    for i in range(0, points.shape[1] - 1, 2):
+        valid = np.isfinite(x_intersections[:, i + 1])
+        span_face.append(row_face[valid])
+        span_y.append(ys[valid])
+        span_x1.append(x_intersections[valid, i])
+        span_x2.append(x_intersections[valid, i + 1])
+        span_z1.append(z_intersections[valid, i])
+        span_z2.append(z_intersections[valid, i + 1])
+
+    span_face = np.concatenate(span_face)
+    span_y = np.concatenate(span_y)
+    span_x1 = np.concatenate(span_x1).astype(np.int64)
+    span_x2 = np.concatenate(span_x2).astype(np.int64)
+    span_z1 = np.concatenate(span_z1)
+    span_z2 = np.concatenate(span_z2)
+
+    # Интерполируем Z вдоль линии
+    length = span_x2 - span_x1
+    z_step = np.divide(
+        span_z2 - span_z1, length, out=np.zeros(len(length)), where=length != 0
+    )
+
+    # Обрезаем отрезки по границам буфера (или плитки)
+    start_x = np.maximum(span_x1, clip_x0)
+    end_x = np.minimum(span_x2, clip_x1 - 1)
+    counts = np.maximum(end_x - start_x + 1, 0)
+    total = counts.sum()
+    if total == 0:
+        return
+
+    # Разворачиваем отрезки в координаты пикселей
+    span_index = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    pixel_x = start_x[span_index] + offsets
+    pixel_y = span_y[span_index]
+    zs = span_z1[span_index] + (pixel_x - span_x1[span_index]) * z_step[span_index]
+    faces = span_face[span_index]
+
+    # Из нескольких кандидатов на пиксель оставляем ближайший,
+    # при равной глубине - из грани, идущей раньше
+    pixels = pixel_y * width + pixel_x
+    order = np.lexsort((faces, zs, pixels))
+    pixels, zs, faces = pixels[order], zs[order], faces[order]
+    first = np.ones(len(pixels), dtype=bool)
+    first[1:] = pixels[1:] != pixels[:-1]
+    pixels, zs, faces = pixels[first], zs[first], faces[first]
+
+    # Тест глубины для всех пикселей сразу
+    z_buffer = z_buffer.reshape(-1)
+    frame_buffer = frame_buffer.reshape(-1, 3)
+    closer = zs < z_buffer[pixels]
+    pixels = pixels[closer]
+    z_buffer[pixels] = zs[closer]
+    frame_buffer[pixels] = color
+
+
+_attached_buffers = {}  # Подключения к разделяемой памяти в процессе пула
+
+
+def _attach_shared_array(name, shape, dtype):
+    if name not in _attached_buffers:
+        memory = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        _attached_buffers[name] = (memory, array)
+    return _attached_buffers[name][1]
+
+
+def _rasterize_tile(names, shape, clip, items, faces_per_batch):
+    """Растеризует грани одной плитки прямо в разделяемые буферы кадра."""
+    frame_buffer = _attach_shared_array(names[0], shape + (3,), np.uint8)
+    z_buffer = _attach_shared_array(names[1], shape, np.float64)
+    for points, z_values, sizes, color in items:
+        fill_faces_with_zbuffer(
+            frame_buffer, z_buffer, points, z_values, sizes, color, clip, faces_per_batch
+        )
+
+
+def get_frame_paths(output, frames):
+    """
+    Имена файлов кадров. Шаблон может содержать {} для номера кадра;
+    иначе для последовательности номер добавляется перед расширением.
+    """
+    if "{" in output:
+        return [output.format(frame) for frame in range(frames)]
+    if frames == 1:
+        return [output]
+    root, extension = os.path.splitext(output)
+    return [f"{root}_{frame:04d}{extension or '.png'}" for frame in range(frames)]
+
+
+def render_frames(
+    polyhedron,
+    output,
+    camera_position,
+    look_at,
+    projection_type="perspective",
+    frames=1,
+    width=400,
+    height=400,
+    workers=1,
+    tile_size=128,
+):
+    """
+    Рендер без окна: кадры пишутся в PNG прямо из кадрового буфера.
+
+    При frames > 1 камера делает полный оборот вокруг точки look_at
+    относительно оси Z (вращающийся стол). При workers > 1 плитки кадра
+    растеризуются параллельно. Возвращает список файлов.
+    """
+    camera = Camera(camera_position, look_at, [0, 0, 1])
+    drawer = PolyhedronDrawer(
+        None,
+        get_progection_matrix(projection_type),
+        camera.get_view_matrix(),
+        camera,
+        objects=[polyhedron],
+        width=width,
+        height=height,
+        workers=workers,
+        tile_size=tile_size,
+    )
+
+    offset = camera.position - camera.look_at
+    paths = get_frame_paths(output, frames)
+    os.makedirs(os.path.dirname(os.path.abspath(paths[0])), exist_ok=True)
+    try:
+        for frame, path in enumerate(paths):
+            angle = 2 * np.pi * frame / frames
+            cos, sin = np.cos(angle), np.sin(angle)
+            camera.position = camera.look_at + np.array(
+                [
+                    offset[0] * cos - offset[1] * sin,
+                    offset[0] * sin + offset[1] * cos,
+                    offset[2],
+                ]
+            )
+            drawer.invalidate_view()
+            Image.fromarray(drawer.render()).save(path)
+    finally:
+        drawer.close()
+    return paths
 
 
 class MainWindow:
@@ -1075,6 +1728,18 @@ class MainWindow:
 
         self.root.bind("<MouseWheel>", self.on_mouse_wheel)
 
+        # Камера и отрисовщик создаются один раз и живут всё время работы окна
+        self.camera = Camera(
+            position=self.camera_position,
+            look_at=self.camera_look_at,
+            up_vector=self.camera_up_vector,
+        )
+        self.view_matrix = self.camera.get_view_matrix()
+        self.projection_matrix = get_progection_matrix(self.projection_type)
+        self.drawer = PolyhedronDrawer(
+            self.canvas, self.projection_matrix, self.view_matrix, self.camera, objects=self.objects
+        )
+
     def select_polyhedron(self, selected_value):
         print(f"Вы выбрали: {selected_value}")
         self.polyhedron_name = selected_value
@@ -1084,6 +1749,8 @@ class MainWindow:
     def select_projection(self, selected_value):
         print(f"Вы выбрали: {selected_value}")
         self.projection_type = selected_value
+        self.projection_matrix = get_progection_matrix(self.projection_type)
+        self.drawer.set_projection_matrix(self.projection_matrix)
         self.redraw()
 
     def on_mouse_wheel(self, event):
@@ -1092,13 +1759,13 @@ class MainWindow:
             self.camera_position[0] += 1
             self.camera_position[1] += 1
             self.camera_position[2] += 1
-            self.redraw()
+            self.move_camera()
         else:
             print("Прокрутили вниз")
             self.camera_position[0] -= 1
             self.camera_position[1] -= 1
             self.camera_position[2] -= 1
-            self.redraw()
+            self.move_camera()
         return
 
     def change_camera_pos(self, com):
@@ -1114,7 +1781,7 @@ class MainWindow:
             self.camera_position[2] += 1
         elif com == "z-":
             self.camera_position[2] -= 1
-        self.redraw()
+        self.move_camera()
 
     def change_look_at(self, com):
         if com == "x+":
@@ -1129,7 +1796,7 @@ class MainWindow:
             self.camera_look_at[2] += 1
         elif com == "z-":
             self.camera_look_at[2] -= 1
-        self.redraw()
+        self.move_camera()
 
     def translate_polyhedron(self, x, y, z):
         self.polyhedron.translate(x, y, z)
@@ -1186,36 +1853,29 @@ class MainWindow:
         self.redraw()
         return
     def clear(self):
-        self.canvas.delete("all")
-        self.drawer = None
-        self.objects = []
+        self.drawer.clear()
 
     def start(self):
         self.polyhedron = get_polyhedron(self.polyhedron_name)
         self.redraw()
         self.root.mainloop()
 
-    def redraw(self):
+    def move_camera(self):
+        """Переносит новые координаты камеры в объект Camera отрисовщика."""
         print(
             f"camera_position: {self.camera_position}, look_at: {self.camera_look_at}"
         )
-        self.canvas.delete("all")
-
-        self.camera = Camera(
-            position=self.camera_position,
-            look_at=self.camera_look_at,
-            up_vector=self.camera_up_vector,
-        )
-        self.view_matrix = self.camera.get_view_matrix()
-        self.projection_matrix = get_progection_matrix(self.projection_type)
-
-        self.drawer = PolyhedronDrawer(
-            self.canvas, self.projection_matrix, self.view_matrix, self.camera, objects=self.objects
-        )
-
+        self.camera.position = np.array(self.camera_position)
+        self.camera.look_at = np.array(self.camera_look_at)
+        self.drawer.invalidate_view()
+        self.redraw()
 
+    def redraw(self):
+        """
+        Добавляет текущий многогранник на сцену (если его там нет) и помечает
+        его вершины изменёнными; кадр перерисуется, когда Tk освободится.
+        """
         self.drawer.add_polyhedron(self.polyhedron)
-        self.drawer.draw()
         return
 
     def load_obj(self):
@@ -1237,7 +1897,57 @@ class MainWindow:
             messagebox.showinfo("Success", "OBJ file saved successfully!")
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Z-буфер рендер многогранников. Без --output открывается окно."
+    )
+    parser.add_argument("--obj", help="файл модели OBJ")
+    parser.add_argument(
+        "--polyhedron", default="cube", help="встроенная фигура, если --obj не задан"
+    )
+    parser.add_argument(
+        "--camera", type=float, nargs=3, default=[5, 5, 6], metavar=("X", "Y", "Z")
+    )
+    parser.add_argument(
+        "--look-at", type=float, nargs=3, default=[0, 0, 0], metavar=("X", "Y", "Z")
+    )
+    parser.add_argument(
+        "--projection", choices=["perspective", "orthographic"], default="perspective"
+    )
+    parser.add_argument("--output", help="PNG файл или шаблон вида frame_{:03d}.png")
+    parser.add_argument("--frames", type=int, default=1, help="кадров вращения камеры")
+    parser.add_argument("--size", type=int, nargs=2, default=[400, 400], metavar=("W", "H"))
+    parser.add_argument("--color", help="цвет модели в HEX, по умолчанию случайный")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="процессов для растеризации плиток"
+    )
+    parser.add_argument("--tile-size", type=int, default=128, help="размер плитки в пикселях")
+    args = parser.parse_args(argv)
+
+    if args.output is None:
+        root = tk.Tk()
+        main_window = MainWindow(root=root)
+        main_window.start()
+        return
+
+    if args.frames < 1:
+        parser.error("--frames должно быть положительным")
+    polyhedron = load_from_obj(args.obj) if args.obj else get_polyhedron(args.polyhedron)
+    if args.color:
+        polyhedron.color = args.color
+    paths = render_frames(
+        polyhedron,
+        args.output,
+        args.camera,
+        args.look_at,
+        args.projection,
+        args.frames,
+        *args.size,
+        workers=args.workers,
+        tile_size=args.tile_size,
+    )
+    print(f"Сохранено кадров: {len(paths)}")
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    main_window = MainWindow(root=root)
-    main_window.start()
\ No newline at end of file
+    main()
@@ -0,0 +1,336 @@
+"""
+Потоковый разбор OBJ, двоичный кэш разобранных массивов и поиск
+уникальных рёбер сетки.
+
+Каждая лабораторная самодостаточна, поэтому lab7/objfile.py - точная
+копия lab8/objfile.py (как lab7/lab6.py). Правки вносятся в обе копии,
+их совпадение проверяет lab8/test_objfile.py.
+"""
+
+import os
+import mmap
+
+import numpy as np
+
+
+OBJ_CHUNK_SIZE = 1 << 22  # Размер куска файла, разбираемого за один проход (4 МБ)
+OBJ_CACHE_VERSION = 2  # 2: координаты в float64
+
+# Коды байтов и типов строк OBJ
+_SPACE, _TAB, _CR, _LF, _SLASH, _HASH = 32, 9, 13, 10, 47, 35
+_KIND_V, _KIND_VT, _KIND_VN, _KIND_F, _KIND_L = 1, 2, 3, 4, 5
+
+
+def _split_obj_chunks(data, chunk_size):
+    """Делит отображённый в память файл на куски по границам строк."""
+    start = 0
+    while start < len(data):
+        end = min(start + chunk_size, len(data))
+        if end < len(data):
+            newline = data.find(b"\n", end)
+            end = len(data) if newline == -1 else newline + 1
+        yield data[start:end]
+        start = end
+
+
+def _find_tokens(text, line_count):
+    """Начала токенов и число токенов в каждой строке текста, склеенного из строк одного типа."""
+    blank = (text == _SPACE) | (text == _TAB) | (text == _CR) | (text == _LF)
+    token_start = ~blank
+    token_start[1:] &= blank[:-1]
+    starts = np.flatnonzero(token_start)
+    lines = np.searchsorted(np.flatnonzero(text == _LF), starts)
+    return starts, np.bincount(lines, minlength=line_count)[:line_count]
+
+
+def _parse_numbers(text, line_count, width):
+    """Разбирает числа строк вида 'x y z' и оставляет первые width значений каждой."""
+    values = np.fromstring(text.tobytes(), dtype=np.float64, sep=" ")
+    if len(values) == line_count * width:
+        return values.reshape(line_count, width)
+
+    # Строки разной длины (w-координата, цвета вершин): берём первые width чисел
+    sizes = _find_tokens(text, line_count)[1]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    columns = np.arange(width)
+    present = columns < sizes[:, None]
+    picked = values[np.minimum(starts[:, None] + columns, len(values) - 1)]
+    return np.where(present, picked, 0).astype(np.float64)
+
+
+def _parse_elements(text, line_count, before):
+    """
+    Разбирает строки граней или ломаных ('1 2 3', '1/2 3/4', '1/2/3', '1//3').
+
+    before - сколько v, vt, vn было объявлено до каждой строки, нужно для
+    отрицательных индексов. Возвращает размеры элементов и индексы (T, 3)
+    в нумерации с нуля; отсутствующие vt/vn помечаются -1.
+    """
+    starts, sizes = _find_tokens(text, line_count)
+    token_count = len(starts)
+
+    slash_positions = np.flatnonzero(text == _SLASH)
+    double_positions = slash_positions[:-1][np.diff(slash_positions) == 1]
+    slash_counts = np.bincount(
+        np.searchsorted(starts, slash_positions, side="right") - 1,
+        minlength=token_count,
+    )
+    double_counts = np.bincount(
+        np.searchsorted(starts, double_positions, side="right") - 1,
+        minlength=token_count,
+    )
+    doubles = len(double_positions) > 0
+
+    # Все токены куска должны быть одной формы, иначе разбираем построчно
+    if np.all(slash_counts == 0):
+        fields = (0,)
+    elif np.all(slash_counts == 1) and not doubles:
+        fields = (0, 1)
+    elif np.all(slash_counts == 2) and not doubles:
+        fields = (0, 1, 2)
+    elif np.all(slash_counts == 2) and np.all(double_counts == 1):
+        fields = (0, 2)
+    else:
+        return _parse_elements_slow(text, before)
+
+    text = text.copy()
+    text[slash_positions] = _SPACE
+    numbers = np.fromstring(text.tobytes(), dtype=np.int64, sep=" ")
+    numbers = numbers.reshape(token_count, len(fields))
+
+    result = np.full((token_count, 3), -1, dtype=np.int64)
+    for column, field in enumerate(fields):
+        values = numbers[:, column]
+        declared = np.repeat(before[:, field], sizes)
+        result[:, field] = np.where(values < 0, values + declared, values - 1)
+    return sizes, result
+
+
+def _parse_elements_slow(text, before):
+    """Построчный разбор элементов смешанной формы (редкий случай)."""
+    sizes, result = [], []
+    for line, declared in zip(text.tobytes().split(b"\n"), before):
+        tokens = line.split()
+        sizes.append(len(tokens))
+        for token in tokens:
+            index = [-1, -1, -1]
+            for field, value in enumerate(token.split(b"/")[:3]):
+                if value:
+                    value = int(value)
+                    index[field] = value + declared[field] if value < 0 else value - 1
+            result.append(index)
+    return (
+        np.array(sizes, dtype=np.int64),
+        np.array(result, dtype=np.int64).reshape(-1, 3),
+    )
+
+
+def _blank_comments(text):
+    """Заменяет пробелами всё от '#' до конца строки, в том числе после данных."""
+    hashes = np.flatnonzero(text == _HASH)
+    if len(hashes) == 0:
+        return
+    line_ids = np.cumsum(text == _LF) - (text == _LF)
+    # Байт закомментирован, если последний '#' до него стоит в той же строке
+    marks = np.full(len(text), -1, dtype=np.int64)
+    marks[hashes] = line_ids[hashes]
+    comment = np.maximum.accumulate(marks) == line_ids
+    text[comment & (text != _LF)] = _SPACE
+
+
+def _parse_obj_chunk(chunk, declared):
+    """
+    Разбирает кусок OBJ целиком на массивах байтов: строки классифицируются
+    по первым символам, ключевые слова стираются, а числа строк каждого
+    типа читаются одним вызовом np.fromstring.
+    """
+    text = np.frombuffer(chunk, dtype=np.uint8).copy()
+    _blank_comments(text)
+    line_starts = np.concatenate(([0], np.flatnonzero(text == _LF) + 1))
+    line_starts = line_starts[line_starts < len(text)]
+    lengths = np.diff(np.append(line_starts, len(text)))
+
+    padded = np.append(text, [_LF, _LF])
+    first, second, third = (padded[line_starts + k] for k in range(3))
+    second_blank = (second == _SPACE) | (second == _TAB)
+    third_blank = (third == _SPACE) | (third == _TAB)
+
+    kinds = np.zeros(len(line_starts), dtype=np.uint8)
+    kinds[(first == ord("v")) & second_blank] = _KIND_V
+    kinds[(first == ord("v")) & (second == ord("t")) & third_blank] = _KIND_VT
+    kinds[(first == ord("v")) & (second == ord("n")) & third_blank] = _KIND_VN
+    kinds[(first == ord("f")) & second_blank] = _KIND_F
+    kinds[(first == ord("l")) & second_blank] = _KIND_L
+
+    # Стираем ключевые слова, остаются только числа
+    text[line_starts[kinds != 0]] = _SPACE
+    text[line_starts[(kinds == _KIND_VT) | (kinds == _KIND_VN)] + 1] = _SPACE
+    kind_of_byte = np.repeat(kinds, lengths)
+
+    # Сколько v, vt, vn объявлено до каждой строки (для отрицательных индексов)
+    before = np.stack(
+        [
+            declared[0] + np.cumsum(kinds == _KIND_V),
+            declared[1] + np.cumsum(kinds == _KIND_VT),
+            declared[2] + np.cumsum(kinds == _KIND_VN),
+        ],
+        axis=1,
+    )
+
+    result = {}
+    for kind, name, width in (
+        (_KIND_V, "vertices", 3),
+        (_KIND_VT, "texcoords", 2),
+        (_KIND_VN, "normals", 3),
+    ):
+        count = np.count_nonzero(kinds == kind)
+        if count:
+            result[name] = _parse_numbers(text[kind_of_byte == kind], count, width)
+
+    for kind, name in ((_KIND_F, "faces"), (_KIND_L, "lines")):
+        rows = kinds == kind
+        if rows.any():
+            result[name] = _parse_elements(
+                text[kind_of_byte == kind], np.count_nonzero(rows), before[rows]
+            )
+
+    declared[:] = before[-1]
+    return result
+
+
+def parse_obj(filepath, chunk_size=OBJ_CHUNK_SIZE):
+    """
+    Потоковый разбор OBJ: файл отображается в память и читается кусками,
+    каждый кусок разбирается векторно. Поддерживаются v, vt, vn, f, l,
+    формы 'a/b/c', 'a//c', 'a/b' и отрицательные индексы.
+
+    Возвращает словарь массивов: vertices, texcoords, normals (float64),
+    indices, texcoord_indices, normal_indices, offsets (грани, int32)
+    и line_indices, line_offsets (ломаные, int32).
+    """
+    parts = {
+        "vertices": [], "texcoords": [], "normals": [], "faces": [], "lines": []
+    }
+    declared = np.zeros(3, dtype=np.int64)
+
+    with open(filepath, "rb") as file:
+        if os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for chunk in _split_obj_chunks(data, chunk_size):
+                    for name, value in _parse_obj_chunk(chunk, declared).items():
+                        parts[name].append(value)
+
+    def stack(values, width):
+        if not values:
+            return np.empty((0, width), dtype=np.float64)
+        return np.concatenate(values).astype(np.float64, copy=False)
+
+    def elements(values):
+        sizes = np.concatenate([s for s, _ in values] or [np.empty(0, np.int64)])
+        indices = np.concatenate([i for _, i in values] or [np.empty((0, 3), np.int64)])
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int32)
+        np.cumsum(sizes, out=offsets[1:])
+        return indices.astype(np.int32), offsets
+
+    face_indices, face_offsets = elements(parts["faces"])
+    line_indices, line_offsets = elements(parts["lines"])
+    return {
+        "vertices": stack(parts["vertices"], 3),
+        "texcoords": stack(parts["texcoords"], 2),
+        "normals": stack(parts["normals"], 3),
+        "indices": face_indices[:, 0],
+        "texcoord_indices": face_indices[:, 1],
+        "normal_indices": face_indices[:, 2],
+        "offsets": face_offsets,
+        "line_indices": line_indices[:, 0],
+        "line_offsets": line_offsets,
+    }
+
+
+def get_obj_cache_path(filepath):
+    """Путь к двоичному кэшу рядом с файлом OBJ."""
+    return filepath + ".cache.npz"
+
+
+def read_obj_cache(filepath):
+    """Читает кэш, если он есть и снят с текущей версии файла (размер и mtime)."""
+    stat = os.stat(filepath)
+    try:
+        with np.load(get_obj_cache_path(filepath)) as data:
+            if (
+                int(data["cache_version"]) != OBJ_CACHE_VERSION
+                or int(data["source_size"]) != stat.st_size
+                or int(data["source_mtime_ns"]) != stat.st_mtime_ns
+            ):
+                return None
+            return {
+                name: data[name]
+                for name in data.files
+                if name not in ("cache_version", "source_size", "source_mtime_ns")
+            }
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def write_obj_cache(filepath, arrays):
+    """Сохраняет разобранные массивы рядом с файлом; ошибки записи не критичны."""
+    stat = os.stat(filepath)
+    cache_path = get_obj_cache_path(filepath)
+    temp_path = cache_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            np.savez(
+                file,
+                cache_version=OBJ_CACHE_VERSION,
+                source_size=stat.st_size,
+                source_mtime_ns=stat.st_mtime_ns,
+                **arrays,
+            )
+        os.replace(temp_path, cache_path)
+    except OSError as error:
+        print(f"Не удалось сохранить кэш {cache_path}: {error}")
+
+
+def read_obj(filepath, use_cache=True):
+    """Массивы модели OBJ: из кэша, если он актуален, иначе разбором файла."""
+    arrays = read_obj_cache(filepath) if use_cache else None
+    if arrays is None:
+        arrays = parse_obj(filepath)
+        if use_cache:
+            write_obj_cache(filepath, arrays)
+    return arrays
+
+
+def get_unique_edges(indices, offsets, line_indices=None, line_offsets=None):
+    """
+    Уникальные рёбра граней и ломаных в виде массива (E, 2) int32.
+
+    Грани и ломаные заданы плоскими массивами индексов со смещениями,
+    как их возвращает parse_obj. Пары индексов упорядочиваются и
+    сортируются, повторы отбрасываются сравнением соседних элементов.
+    """
+    # Грани замкнуты: последняя вершина соединяется с первой
+    indices = np.asarray(indices, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    filled = offsets[1:] > offsets[:-1]
+    next_positions = np.arange(1, len(indices) + 1)
+    next_positions[offsets[1:][filled] - 1] = offsets[:-1][filled]
+    starts, ends = [indices], [indices[next_positions[: len(indices)]]]
+
+    # Ломаные не замкнуты: последняя вершина ломаной не начинает ребра
+    if line_indices is not None and len(line_indices):
+        indices = np.asarray(line_indices, dtype=np.int64)
+        offsets = np.asarray(line_offsets, dtype=np.int64)
+        not_last = np.ones(len(indices), dtype=bool)
+        not_last[offsets[1:][offsets[1:] > 0] - 1] = False
+        starts.append(indices[:-1][not_last[:-1]])
+        ends.append(indices[1:][not_last[:-1]])
+
+    starts, ends = np.concatenate(starts), np.concatenate(ends)
+    if len(starts) == 0:
+        return np.empty((0, 2), dtype=np.int32)
+
+    base = max(starts.max(), ends.max()) + 1
+    keys = np.sort(np.minimum(starts, ends) * base + np.maximum(starts, ends))
+    keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return np.stack(divmod(keys, base), axis=1).astype(np.int32)
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from objfile import get_unique_edges, parse_obj, read_obj
+
+
+def write_obj(tmp_path, text):
+    path = tmp_path / "model.obj"
+    path.write_text(text)
+    return str(path)
+
+
+def test_inline_comments(tmp_path):
+    """Комментарий после данных не ломает разбор чисел и индексов."""
+    path = write_obj(
+        tmp_path,
+        "# куб без двух граней\n"
+        "v 0 0 0 # a\n"
+        "v 1 0 0\n"
+        "v 1 1 0  # c, 3 числа\n"
+        "v 0 1 0\n"
+        "vt 0.5 0.5 # uv\n"
+        "f 1/1 2/1 3/1 # первая\n"
+        "f 1/1 3/1 4/1\n"
+        "l 1 2 # ребро\n",
+    )
+    arrays = parse_obj(path)
+    assert np.array_equal(
+        arrays["vertices"], [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]]
+    )
+    assert np.array_equal(arrays["texcoords"], [[0.5, 0.5]])
+    assert np.array_equal(arrays["indices"], [0, 1, 2, 0, 2, 3])
+    assert np.array_equal(arrays["texcoord_indices"], [0] * 6)
+    assert np.array_equal(arrays["offsets"], [0, 3, 6])
+    assert np.array_equal(arrays["line_indices"], [0, 1])
+
+
+def test_comments_across_chunks(tmp_path):
+    """Тот же результат при разбиении на мелкие куски и без комментариев."""
+    lines = []
+    for i in range(50):
+        lines.append(f"v {i} {i * 2} {-i} # вершина {i}\n")
+    for i in range(1, 49):
+        lines.append(f"f {i} {i + 1} -1 #грань\n" if i % 3 else f"f {i} {i + 1} 50\n")
+    commented = write_obj(tmp_path, "".join(lines))
+    plain = str(tmp_path / "plain.obj")
+    with open(plain, "w") as file:
+        file.write("".join(line.split("#")[0] + "\n" for line in lines))
+
+    expected = parse_obj(plain)
+    for chunk_size in (16, 100, 1 << 22):
+        arrays = parse_obj(commented, chunk_size)
+        for name, value in expected.items():
+            assert np.array_equal(arrays[name], value), (name, chunk_size)
+
+
+def test_cache_roundtrip(tmp_path):
+    path = write_obj(tmp_path, "v 0 0 0\nv 1 0 0\nv 0 1 0 # c\nf 1 2 3\n")
+    first = read_obj(path)
+    cached = read_obj(path)
+    for name, value in first.items():
+        assert np.array_equal(cached[name], value)
+
+
+def test_coordinates_are_float64(tmp_path):
+    """Координаты читаются без потерь, как float() в построчном разборе."""
+    path = write_obj(tmp_path, "v 0.1 1234567.891 -2.5e-7\nv 1 2 3 4\n")
+    vertices = parse_obj(path)["vertices"]
+    assert vertices.dtype == np.float64
+    assert vertices.tolist() == [[0.1, 1234567.891, -2.5e-7], [1.0, 2.0, 3.0]]
+
+
+def test_lab7_copy_matches():
+    """lab7 хранит свою копию разбора OBJ: она не должна расходиться с lab8."""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(folder, "objfile.py"), "rb") as file:
+        lab8_source = file.read()
+    with open(os.path.join(folder, "..", "lab7", "objfile.py"), "rb") as file:
+        assert file.read() == lab8_source
+
+
+def test_unique_edges():
+    """Рёбра граней замкнуты, ломаных - нет; общие рёбра не повторяются."""
+    faces = [[0, 1, 2], [0, 2, 3], []]
+    lines = [[3, 4, 5], [5, 0]]
+    indices, offsets = np.concatenate(faces).astype(int), [0, 3, 6, 6]
+    line_indices, line_offsets = np.concatenate(lines), [0, 3, 5]
+    edges = get_unique_edges(indices, offsets, line_indices, line_offsets)
+    assert edges.dtype == np.int32
+    assert edges.tolist() == [
+        [0, 1], [0, 2], [0, 3], [0, 5], [1, 2], [2, 3], [3, 4], [4, 5]
+    ]
+    assert get_unique_edges([], [0]).shape == (0, 2)
@@ -119,6 +119,7 @@ class PhongSphereApp:
         self.last_mouse_pos = (event.x, event.y)
 
 
-root = tk.Tk()
-app = PhongSphereApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = PhongSphereApp(root)
+    root.mainloop()